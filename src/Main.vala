@@ -25,10 +25,10 @@ namespace Scramble {
             // Actions for app menu
             var act_prefs = new GLib.SimpleAction("preferences", null);
             act_prefs.activate.connect((param) => {
-                var win = this.active_window as Window;
-                if (win == null) {
-                    win = new Window(this);
-                }
+                // Reuse the existing window instead of building a whole new one
+                // that is never presented just to parent the dialog
+                activate();
+                var win = this.active_window ?? main_window;
                 var dlg = new Preferences();
                 dlg.present(win);
             });
@@ -114,6 +114,10 @@ namespace Scramble {
     }
 
     public static int main(string[] args) {
+#if HAVE_GEXIV2
+        // Initialise exiv2 (and its XMP toolkit) once before worker threads use it
+        GExiv2.initialize();
+#endif
         Gtk.init();
         var app = new Application();
         return app.run(args);
@@ -1,6 +1,5 @@
 using Gtk;
 using Adw;
-using Gdk;
 
 namespace Scramble {
 #if DEVELOPMENT
@@ -23,12 +22,43 @@ public class Window : Adw.ApplicationWindow {
         [GtkChild] private unowned Gtk.Separator header_separator;
 
         private string? current_image_path;
-        private GLib.Settings settings;
+        private string? current_image_fingerprint;
+
+        // File name of the current image split once, for the dialogs' default names
+        private string current_image_stem = "";
+        private string current_image_ext = "";
+
+        // File dialog filters, built the first time each dialog opens
+        private GLib.ListStore? open_filters = null;
+        private GLib.ListStore? save_filters = null;
+        private GLib.ListStore? batch_filters = null;
+
+        // Save dialog, configured once and reused for every clean copy
+        private Gtk.FileDialog? save_dialog = null;
+
+        // Batch progress toast, updated in place until the batch ends
+        private Adw.Toast? progress_toast = null;
+
+        // Last toast shown, so an identical one right after it is skipped
+        private string? last_toast_message = null;
+        private int64 last_toast_time = 0;
+
+        // Incremented per load and on clear, so a load finishing after the
+        // image was cleared does not show it again
+        private uint load_generation = 0;
+
+        // Set while a load runs on its worker thread; one load at a time
+        private bool load_in_progress = false;
+
+        // Latest image requested during a load, started when that load ends
+        private string? pending_load_path = null;
+
+        // Set while a batch runs on worker threads; one batch at a time
+        private bool batch_in_progress = false;
         private MetadataDisplay metadata_display;
 
         public Window(Adw.Application app) {
             Object(application: app);
-            settings = new GLib.Settings(Config.APP_ID);
 
             // Setup actions and shortcuts
             setup_actions();
@@ -57,13 +87,7 @@ public class Window : Adw.ApplicationWindow {
         private void setup_drag_and_drop() {
             var drop_target = new Gtk.DropTarget(typeof(GLib.File), Gdk.DragAction.COPY);
             drop_target.drop.connect(on_drop);
-
-            // Use a more direct approach to avoid the add_controller issue
-            var event_controller = drop_target as Gtk.EventController;
-            if (event_controller != null) {
-                var widget = this as Gtk.Widget;
-                widget.add_controller(event_controller);
-            }
+            this.add_controller(drop_target);
         }
 
         private void setup_actions() {
@@ -140,43 +164,16 @@ public class Window : Adw.ApplicationWindow {
             var dlg = new Gtk.FileDialog();
             dlg.title = _("Open Image File");
 
-            // Add file filters for supported formats
-            var filters = new GLib.ListStore(typeof(Gtk.FileFilter));
-
-            var f_images = new Gtk.FileFilter();
-            f_images.name = _("Image Files");
-            f_images.add_mime_type("image/jpeg");
-            f_images.add_mime_type("image/png");
-            f_images.add_mime_type("image/webp");
-            f_images.add_mime_type("image/tiff");
-            f_images.add_mime_type("image/heif");
-            f_images.add_mime_type("image/heic");
-            f_images.add_pattern("*.jpg");
-            f_images.add_pattern("*.jpeg");
-            f_images.add_pattern("*.png");
-            f_images.add_pattern("*.webp");
-            f_images.add_pattern("*.tif");
-            f_images.add_pattern("*.tiff");
-            f_images.add_pattern("*.heif");
-            f_images.add_pattern("*.heic");
-            filters.append(f_images);
-
-            var f_all = new Gtk.FileFilter();
-            f_all.name = _("All Files");
-            f_all.add_pattern("*");
-            filters.append(f_all);
-
-            dlg.filters = filters;
-            dlg.default_filter = f_images;
+            // Add file filters for supported formats (built once, shared by every open)
+            dlg.filters = get_open_filters();
+            dlg.default_filter = (Gtk.FileFilter) dlg.filters.get_item(0);
 
             dlg.open.begin(this, null, (obj, res) => {
                 try {
                     var file = dlg.open.end(res);
                     string? path = file.get_path();
-                    if (path != null && ImageOperations.is_supported_format(path)) {
+                    if (path != null) {
                         load_image(path);
-                    } else if (path != null) {
-                        show_error_toast(_("Unsupported file format. Please use JPEG, PNG, TIFF, or WebP files."));
                     }
                 } catch (Error e) {
                     // User cancelled or error occurred - silently ignore
@@ -185,45 +182,182 @@ public class Window : Adw.ApplicationWindow {
         }
 
         internal void load_image(string path) {
-            try {
-                // Validate file path for security
-                FileValidator.validate_path(path);
-
-                // Validate format by magic numbers (SEC-003)
-                var ext = ImageOperations.is_supported_format(path) ? get_file_extension(path) : "";
-                if (ext != "") {
-                    if (!MagicNumberValidator.validate_format(path, ext)) {
-                        var error_msg = MagicNumberValidator.get_validation_error_message(path, ext);
-                        throw new FileError.FAILED(error_msg);
-                    }
+            // Extension check first: it needs no disk access, so files opened
+            // from the command line are rejected before any stat or read
+            if (!ImageOperations.is_supported_format(path)) {
+                show_error_toast(_("Unsupported file format. Please use JPEG, PNG, TIFF, or WebP files."));
+                return;
+            }
+
+            // Rapid drops would otherwise decode several files at once, so
+            // only the latest one waits for the running load to finish
+            if (load_in_progress) {
+                pending_load_path = path;
+                return;
+            }
+            load_image_async.begin(path);
+        }
+
+        /**
+         * Validate and parse an image off the main thread, then show it
+         *
+         * Only the widget updates run on the main thread. load_image starts
+         * no other load until this one finishes; if another image was
+         * requested meanwhile, this result is dropped and that one loads.
+         */
+        private async void load_image_async(string path) {
+            var generation = ++load_generation;
+            load_in_progress = true;
+            string? shown_fingerprint = (path == current_image_path) ? current_image_fingerprint : null;
+            string? fingerprint = null;
+            Gdk.Texture? preview = null;
+            Error? load_error = null;
+
+            SourceFunc resume = load_image_async.callback;
+            new Thread<bool>("image-load", () => {
+                try {
+                    fingerprint = prepare_image(path, shown_fingerprint, out preview);
+                } catch (Error e) {
+                    load_error = e;
                 }
+                Idle.add((owned) resume);
+                return true;
+            });
+            yield;
+            load_in_progress = false;
+
+            // A newer request supersedes this result
+            if (pending_load_path != null) {
+                var next_path = pending_load_path;
+                pending_load_path = null;
+                load_image_async.begin(next_path);
+                return;
+            }
 
-                current_image_path = path;
+            if (generation != load_generation) {
+                return;
+            }
 
-                // Preview
-                image_preview.set_filename(path);
-                image_container.visible = true;
-                welcome_page.visible = false;
-                save_button_header.sensitive = true;
-
-                // Show header bar buttons when image is loaded
-                header_separator.visible = true;
-                save_button_header.visible = true;
-                save_button_header.sensitive = true;
-                clear_button_header.visible = true;
-
-                // Metadata
-                metadata_display.update_from_file(path);
-            } catch (Error e) {
+            if (load_error != null) {
                 // Sanitize error message to avoid path disclosure
-                var safe_msg = FileValidator.sanitize_error_message(e.message);
+                var safe_msg = FileValidator.sanitize_error_message(load_error.message);
                 show_error_toast(_("Error loading image: %s").printf(safe_msg));
+                return;
+            }
+
+            // Dropping or reopening the image already shown needs no reload
+            if (shown_fingerprint != null && fingerprint == shown_fingerprint) {
+                return;
+            }
+
+            set_current_image(path, fingerprint);
+
+            // Preview (decoded at reduced size by the worker when possible)
+            if (preview != null) {
+                image_preview.set_paintable(preview);
+            } else {
+                image_preview.set_filename(path);
+            }
+            image_container.visible = true;
+            welcome_page.visible = false;
+            save_button_header.sensitive = true;
+
+            // Show header bar buttons when image is loaded
+            header_separator.visible = true;
+            save_button_header.visible = true;
+            save_button_header.sensitive = true;
+            clear_button_header.visible = true;
+
+            // Metadata (parsed by the worker, served from the cache)
+            metadata_display.update_from_file(path);
+        }
+
+        /**
+         * Run the load-time checks and warm the metadata cache
+         *
+         * Runs on a worker thread, so it must not touch any widget.
+         *
+         * @param path Image file path
+         * @param shown_fingerprint Fingerprint of the image already shown at path, if any
+         * @param preview Downscaled preview, or null if it could not be decoded here
+         * @return Fingerprint of the file
+         * @throws Error if the file fails validation
+         */
+        private static string prepare_image(string path, string? shown_fingerprint, out Gdk.Texture? preview) throws Error {
+            preview = null;
+
+            // Validate file path for security; the same query fingerprints it
+            var fingerprint = FileValidator.validate_and_fingerprint(path);
+            if (fingerprint == shown_fingerprint) {
+                return fingerprint;
+            }
+
+            // Validate format by magic numbers (SEC-003), then refuse
+            // decompression bombs before the preview decodes them. Both read
+            // the header, so they share one open and rewind in between.
+            // load_image already rejected unsupported extensions.
+            var ext = ImageOperations.get_file_extension(path);
+            var stream = File.new_for_path(path).read();
+            try {
+                if (!MagicNumberValidator.validate_stream_format(stream, ext)) {
+                    var error_msg = MagicNumberValidator.get_validation_error_message(path, ext);
+                    throw new FileError.FAILED(error_msg);
+                }
+                stream.seek(0, SeekType.SET);
+                ImageOperations.check_stream_pixel_limit(stream);
+            } finally {
+                stream.close();
+            }
+
+            try {
+                preview = ImageOperations.load_preview(path, Constants.PREVIEW_MAX_SIZE);
+            } catch (Error e) {
+                // Leave it to Gtk.Picture, which may have other loaders
+                debug("Preview decode failed: %s", e.message);
+            }
+
+#if HAVE_GEXIV2
+            // Parse metadata here so the display reads it from the cache
+            try {
+                MetadataCache.open(path);
+            } catch (Error e) {
+                debug("Metadata not readable: %s", e.message);
+            }
+#endif
+
+            return fingerprint;
+        }
+
+        /**
+         * Set the image being shown and split its file name once
+         *
+         * @param path Image file path, or null when no image is shown
+         * @param fingerprint File fingerprint of path, or null
+         */
+        private void set_current_image(string? path, string? fingerprint) {
+            current_image_path = path;
+            current_image_fingerprint = fingerprint;
+            current_image_stem = "";
+            current_image_ext = "";
+            if (path == null) {
+                return;
+            }
+
+            var basename = GLib.Path.get_basename(path);
+            var dot = basename.last_index_of_char('.');
+            if (dot > 0) {
+                current_image_stem = basename.substring(0, dot);
+                current_image_ext = basename.substring(dot);
+            } else {
+                current_image_stem = basename;
             }
         }
 
         private void on_clear_clicked() {
-            // Clear current image state
-            current_image_path = null;
+            // Clear current image state; a load still in flight is discarded
+            load_generation++;
+            pending_load_path = null;
+            set_current_image(null, null);
 
             // Hide image and show welcome screen
             image_container.visible = false;
@@ -248,58 +382,10 @@ public class Window : Adw.ApplicationWindow {
             if (current_image_path == null)
                 return;
 
-            var dlg = new Gtk.FileDialog();
-            dlg.title = _("Save Clean Image");
+            var dlg = get_save_dialog();
 
             // Default name
-            var basename = GLib.Path.get_basename(current_image_path);
-            var dot = basename.last_index_of(".");
-            string name = basename;
-            string ext = "";
-            if (dot > 0) {
-                name = basename.substring(0, dot);
-                ext = basename.substring(dot);
-            }
-            dlg.initial_name = "%s_clean%s".printf(name, ext);
-
-            // Filters
-            var filters = new GLib.ListStore(typeof(Gtk.FileFilter));
-
-            var f_jpeg = new Gtk.FileFilter();
-            f_jpeg.name = _("JPEG Images");
-            f_jpeg.add_mime_type("image/jpeg");
-            f_jpeg.add_pattern("*.jpg");
-            f_jpeg.add_pattern("*.jpeg");
-            filters.append(f_jpeg);
-
-            var f_png = new Gtk.FileFilter();
-            f_png.name = _("PNG Images");
-            f_png.add_mime_type("image/png");
-            f_png.add_pattern("*.png");
-            filters.append(f_png);
-
-            var f_webp = new Gtk.FileFilter();
-            f_webp.name = _("WebP Images");
-            f_webp.add_mime_type("image/webp");
-            f_webp.add_pattern("*.webp");
-            filters.append(f_webp);
-
-            var f_tiff = new Gtk.FileFilter();
-            f_tiff.name = _("TIFF Images");
-            f_tiff.add_mime_type("image/tiff");
-            f_tiff.add_pattern("*.tif");
-            f_tiff.add_pattern("*.tiff");
-            filters.append(f_tiff);
-
-            var f_heif = new Gtk.FileFilter();
-            f_heif.name = _("HEIF/HEIC Images");
-            f_heif.add_mime_type("image/heif");
-            f_heif.add_mime_type("image/heic");
-            f_heif.add_pattern("*.heif");
-            f_heif.add_pattern("*.heic");
-            filters.append(f_heif);
-
-            dlg.filters = filters;
+            dlg.initial_name = "%s_clean%s".printf(current_image_stem, current_image_ext);
 
             dlg.save.begin(this, null, (obj, res) => {
                 try {
@@ -310,11 +396,14 @@ public class Window : Adw.ApplicationWindow {
                         // Debug logging
                         debug("Saving to path: %s", out_path);
 
-                        if (ImageOperations.save_clean_copy(current_image_path, out_path)) {
-                            show_success_toast(_("Clean image saved to %s").printf(GLib.Path.get_basename(out_path)));
-                        } else {
-                            show_error_toast(_("Failed to save clean image"));
-                        }
+                        ImageOperations.save_clean_copy_async.begin(current_image_path, out_path, (obj2, res2) => {
+                            var saved_path = ImageOperations.save_clean_copy_async.end(res2);
+                            if (saved_path != null) {
+                                show_success_toast(_("Clean image saved to %s").printf(GLib.Path.get_basename(saved_path)));
+                            } else {
+                                show_error_toast(_("Failed to save clean image"));
+                            }
+                        });
                     } else {
                         show_error_toast(_("No output path selected"));
                     }
@@ -326,24 +415,17 @@ public class Window : Adw.ApplicationWindow {
         }
 
         private void on_batch_process_clicked() {
+            if (batch_in_progress) {
+                show_error_toast(_("Batch processing is already running"));
+                return;
+            }
+
             // Open file dialog to select multiple files
             var dlg = new Gtk.FileDialog();
             dlg.title = _("Select Images for Batch Processing");
 
-            // Filters
-            var filters = new GLib.ListStore(typeof(Gtk.FileFilter));
-
-            var f_images = new Gtk.FileFilter();
-            f_images.name = _("All Supported Images");
-            f_images.add_mime_type("image/jpeg");
-            f_images.add_mime_type("image/png");
-            f_images.add_mime_type("image/webp");
-            f_images.add_mime_type("image/tiff");
-            f_images.add_mime_type("image/heif");
-            f_images.add_mime_type("image/heic");
-            filters.append(f_images);
-
-            dlg.filters = filters;
+            // Filters (built once, shared by every batch)
+            dlg.filters = get_batch_filters();
 
             // Use open_multiple to select multiple files
             dlg.open_multiple.begin(this, null, (obj, res) => {
@@ -393,28 +475,41 @@ public class Window : Adw.ApplicationWindow {
         }
 
         private void process_batch(List<string> paths, string output_dir) {
-            show_success_toast(_("Processing %d images...").printf((int)paths.length()));
-
-            // Process on main thread - GdkPixbuf is not thread-safe
-            var results = BatchProcessor.process_batch(paths, output_dir, (current, total, filename) => {
-                show_success_toast(_("Processing %d/%d: %s").printf(current, total, filename));
-            });
+            // The file dialogs are async, so re-check once the user has chosen
+            if (batch_in_progress) {
+                show_error_toast(_("Batch processing is already running"));
+                return;
+            }
+            batch_in_progress = true;
+
+            show_progress_toast(_("Processing %d images...").printf((int)paths.length()));
+
+            // Process on worker threads; each file uses its own pixbuf and metadata objects
+            BatchProcessor.process_batch_async.begin(paths, output_dir, (current, total, filename) => {
+                show_progress_toast(_("Processing %d/%d: %s").printf(current, total, filename));
+            }, (obj, res) => {
+                var results = BatchProcessor.process_batch_async.end(res);
+                batch_in_progress = false;
+                if (progress_toast != null) {
+                    progress_toast.dismiss();
+                }
 
-            // Show final report
-            int success_count, failed_count;
-            BatchProcessor.get_summary(results, out success_count, out failed_count);
+                // Show final report
+                int success_count, failed_count;
+                BatchProcessor.get_summary(results, out success_count, out failed_count);
 
-            if (failed_count == 0) {
-                show_success_toast(_("Successfully processed %d images!").printf(success_count));
-            } else {
-                show_error_toast(_("Processed %d images (%d failed)").printf(success_count, failed_count));
+                if (failed_count == 0) {
+                    show_success_toast(_("Successfully processed %d images!").printf(success_count));
+                } else {
+                    show_error_toast(_("Processed %d images (%d failed)").printf(success_count, failed_count));
 
-                // Show detailed report in a dialog
-                var report_dialog = new Adw.AlertDialog(_("Batch Processing Complete"), BatchProcessor.generate_report(results));
-                report_dialog.add_response("ok", _("OK"));
-                report_dialog.default_response = "ok";
-                report_dialog.present(this);
-            }
+                    // Show detailed report in a dialog
+                    var report_dialog = new Adw.AlertDialog(_("Batch Processing Complete"), BatchProcessor.generate_report(results));
+                    report_dialog.add_response("ok", _("OK"));
+                    report_dialog.default_response = "ok";
+                    report_dialog.present(this);
+                }
+            });
         }
 
         private void on_export_metadata_clicked() {
@@ -449,13 +544,7 @@ public class Window : Adw.ApplicationWindow {
             dlg.title = _("Export Metadata");
 
             // Default name
-            var basename = GLib.Path.get_basename(current_image_path);
-            var dot = basename.last_index_of(".");
-            string name = basename;
-            if (dot > 0) {
-                name = basename.substring(0, dot);
-            }
-            dlg.initial_name = "%s_metadata.%s".printf(name, format_name);
+            dlg.initial_name = "%s_metadata.%s".printf(current_image_stem, format_name);
 
             // Filters
             var filters = new GLib.ListStore(typeof(Gtk.FileFilter));
@@ -505,41 +594,107 @@ public class Window : Adw.ApplicationWindow {
         }
 
         private void show_error_toast(string msg) {
-            var t = new Adw.Toast(msg);
-            t.timeout = 3;
-            toast_overlay.add_toast(t);
+            if (!is_repeated_toast(msg)) {
+                show_toast(msg, 3);
+            }
         }
 
         private void show_success_toast(string msg) {
+            if (!is_repeated_toast(msg)) {
+                show_toast(msg, 2);
+            }
+        }
+
+        /**
+         * Check whether msg repeats the toast shown just before it
+         *
+         * Repeating a message within TOAST_REPEAT_INTERVAL_MS (such as
+         * dropping the same unsupported file twice) would only queue an
+         * identical toast behind the first.
+         */
+        private bool is_repeated_toast(string msg) {
+            var now = get_monotonic_time();
+            if (msg == last_toast_message &&
+                now - last_toast_time < Constants.TOAST_REPEAT_INTERVAL_MS * 1000) {
+                return true;
+            }
+            last_toast_message = msg;
+            last_toast_time = now;
+            return false;
+        }
+
+        /**
+         * Show batch progress in a single toast
+         *
+         * Progress messages go stale as soon as the next one arrives, so the
+         * toast already shown is retitled instead of queueing a new one. It
+         * does not time out; the batch dismisses it when it finishes.
+         */
+        private void show_progress_toast(string msg) {
+            if (progress_toast != null) {
+                progress_toast.title = msg;
+                return;
+            }
+            progress_toast = show_toast(msg, 0);
+            progress_toast.dismissed.connect(on_progress_toast_dismissed);
+        }
+
+        private void on_progress_toast_dismissed(Adw.Toast toast) {
+            if (progress_toast == toast) {
+                progress_toast = null;
+            }
+        }
+
+        private Adw.Toast show_toast(string msg, uint timeout) {
             var t = new Adw.Toast(msg);
-            t.timeout = 2;
+            t.timeout = timeout;
             toast_overlay.add_toast(t);
+            return t;
+        }
+
+        /**
+         * Filters for the open dialog, created on first use
+         */
+        private GLib.ListStore get_open_filters() {
+            if (open_filters == null) {
+                open_filters = FileFilters.create_open_filters();
+            }
+            return open_filters;
         }
 
         /**
-         * Get file extension from path
+         * Save dialog for clean copies, created on first use
          *
-         * @param path File path
-         * @return File extension (e.g., "jpg", "png") without the dot
+         * Only the default name changes between saves.
          */
-        private string get_file_extension(string path) {
-            var lower = path.down();
-            if (lower.has_suffix(".jpg")) return "jpg";
-            if (lower.has_suffix(".jpeg")) return "jpeg";
-            if (lower.has_suffix(".png")) return "png";
-            if (lower.has_suffix(".webp")) return "webp";
-            if (lower.has_suffix(".tif")) return "tif";
-            if (lower.has_suffix(".tiff")) return "tiff";
-            if (lower.has_suffix(".heif")) return "heif";
-            if (lower.has_suffix(".heic")) return "heic";
-
-            // Fallback: extract extension after last dot
-            var parts = path.split(".");
-            if (parts.length > 1) {
-                return parts[parts.length - 1].down();
+        private Gtk.FileDialog get_save_dialog() {
+            if (save_dialog == null) {
+                save_dialog = new Gtk.FileDialog();
+                save_dialog.title = _("Save Clean Image");
+                save_dialog.filters = get_save_filters();
             }
+            return save_dialog;
+        }
 
-            return "";
+        /**
+         * Filters for the save dialog, created on first use
+         */
+        private GLib.ListStore get_save_filters() {
+            if (save_filters == null) {
+                save_filters = FileFilters.create_save_filters();
+            }
+            return save_filters;
+        }
+
+        /**
+         * Filters for the batch selection dialog, created on first use
+         */
+        private GLib.ListStore get_batch_filters() {
+            if (batch_filters == null) {
+                batch_filters = new GLib.ListStore(typeof(Gtk.FileFilter));
+                batch_filters.append(FileFilters.create_images_filter(_("All Supported Images")));
+            }
+            return batch_filters;
         }
     }
 }
@@ -1,4 +1,3 @@
-using Gdk;
 using GLib;
 
 namespace Scramble {
@@ -30,32 +29,171 @@ namespace Scramble {
         public delegate void ProgressCallback(int current, int total, string current_file);
 
         /**
-         * Process multiple images in batch
+         * Process multiple images in batch on worker threads
+         *
+         * Files are spread over one worker per CPU core, up to
+         * Constants.BATCH_MAX_WORKERS. A file listed more than once (or
+         * hard-linked under another name) is cleaned once, and its repeats
+         * share that result. Different files whose clean copies would get the
+         * same name are given numbered names instead. Results keep the order
+         * of the input list, and progress is reported on the main loop.
          *
          * @param input_paths List of input image paths
          * @param output_dir Directory to save processed images
-         * @param callback Optional progress callback
+         * @param progress_callback Optional progress callback, invoked on the main loop
          * @return List of batch results
          */
-        public static List<BatchResult> process_batch(
+        public static async List<BatchResult> process_batch_async(
             List<string> input_paths,
             string output_dir,
-            ProgressCallback? callback = null
+            owned ProgressCallback? progress_callback = null
         ) {
+            // Copy the paths before yielding so workers never touch the caller's list
+            string[] paths = {};
+            foreach (var input_path in input_paths) {
+                paths += input_path;
+            }
+
             var results = new List<BatchResult>();
-            int current = 0;
-            int total = (int)input_paths.length();
+            int total = paths.length;
+            if (total == 0) {
+                return results;
+            }
 
-            foreach (var input_path in input_paths) {
-                current++;
+            // Find repeated files first; this stats every input, so off the main loop
+            int[] duplicate_of = {};
+            string[] output_paths = {};
+            SourceFunc resume_scan = process_batch_async.callback;
+            new Thread<bool>("batch-scan", () => {
+                duplicate_of = find_duplicates(paths);
+                output_paths = plan_output_paths(paths, duplicate_of, output_dir);
+                Idle.add((owned) resume_scan);
+                return true;
+            });
+            yield;
+
+            int[] unique = {};
+            for (int i = 0; i < total; i++) {
+                if (duplicate_of[i] < 0) {
+                    unique += i;
+                }
+            }
+            int unique_total = unique.length;
+
+            var slots = new BatchResult[total];
+            int next_index = 0;
+            int completed = 0;
+            // Each worker may hold a full decode in memory, so the pool is capped
+            int workers = int.min(int.min((int) GLib.get_num_processors(), Constants.BATCH_MAX_WORKERS),
+                                  unique_total);
+            int running = workers;
+            SourceFunc resume = process_batch_async.callback;
+
+            for (int w = 0; w < workers; w++) {
+                new Thread<bool>("batch-worker", () => {
+                    while (true) {
+                        int next = AtomicInt.add(ref next_index, 1);
+                        if (next >= unique_total) {
+                            break;
+                        }
+                        int index = unique[next];
+
+                        slots[index] = process_file(paths[index], output_paths[index]);
+
+                        if (progress_callback != null) {
+                            int current = AtomicInt.add(ref completed, 1) + 1;
+                            var filename = Path.get_basename(paths[index]);
+                            Idle.add(() => {
+                                progress_callback(current, unique_total, filename);
+                                return Source.REMOVE;
+                            });
+                        }
+                    }
+
+                    // Last worker out resumes the caller on the main loop
+                    if (AtomicInt.dec_and_test(ref running)) {
+                        Idle.add((owned) resume);
+                    }
+                    return true;
+                });
+            }
+
+            yield;
+
+            for (int i = 0; i < total; i++) {
+                var original = duplicate_of[i];
+                if (original >= 0) {
+                    var first = slots[original];
+                    slots[i] = new BatchResult(paths[i], first.output_path, first.success, first.error_message);
+                }
+                results.append(slots[i]);
+            }
+
+            return results;
+        }
+
+        /**
+         * Find inputs that are the same file as an earlier input
+         *
+         * Files are compared by fingerprint (device, inode, size and
+         * modification time), so repeats are found without reading them.
+         * A file that cannot be queried counts as unique; processing it
+         * reports the error.
+         *
+         * @param paths Input image paths
+         * @return For each input, the index of its first occurrence, or -1
+         */
+        private static int[] find_duplicates(string[] paths) {
+            var duplicate_of = new int[paths.length];
+            // Maps a fingerprint to its first index plus one (0 means unseen)
+            var first_seen = new HashTable<string, int>(str_hash, str_equal);
+
+            for (int i = 0; i < paths.length; i++) {
+                duplicate_of[i] = -1;
+                string fingerprint;
+                try {
+                    fingerprint = FileValidator.get_fingerprint(paths[i]);
+                } catch (Error e) {
+                    continue;
+                }
 
-                // Call progress callback
-                if (callback != null) {
-                    callback(current, total, Path.get_basename(input_path));
+                var seen = first_seen.lookup(fingerprint);
+                if (seen > 0) {
+                    duplicate_of[i] = seen - 1;
+                } else {
+                    first_seen.insert(fingerprint, i + 1);
+                }
+            }
+
+            return duplicate_of;
+        }
+
+        /**
+         * Choose a distinct output path for every file of a batch
+         *
+         * The clean copy is named after the input ("IMG_1.jpg" becomes
+         * "IMG_1_clean.jpg"). Inputs from different folders can share a
+         * name, and workers writing one path at the same time would corrupt
+         * it, so later inputs get a numbered name ("IMG_1_clean_2.jpg").
+         * Names are compared as written by ImageOperations.get_output_path()
+         * and ignoring case, so "a", "a.jpg" and "A.JPG" do not share a file.
+         *
+         * @param paths Input image paths
+         * @param duplicate_of Result of find_duplicates(); repeats share a path
+         * @param output_dir Directory to save processed images
+         * @return Output path for each input
+         */
+        private static string[] plan_output_paths(string[] paths, int[] duplicate_of, string output_dir) {
+            var output_paths = new string[paths.length];
+            var taken = new GenericSet<string>(str_hash, str_equal);
+
+            for (int i = 0; i < paths.length; i++) {
+                if (duplicate_of[i] >= 0) {
+                    output_paths[i] = output_paths[duplicate_of[i]];
+                    continue;
                 }
 
-                // Generate output path
-                var basename = Path.get_basename(input_path);
+                var basename = Path.get_basename(paths[i]);
                 var dot = basename.last_index_of(".");
                 string name = basename;
                 string ext = "";
@@ -63,42 +201,42 @@ namespace Scramble {
                     name = basename.substring(0, dot);
                     ext = basename.substring(dot);
                 }
-                var output_path = Path.build_filename(output_dir, "%s_clean%s".printf(name, ext));
-
-                // Process the image
-                try {
-                    // Validate file path
-                    FileValidator.validate_path(input_path);
-
-                    // Validate format by magic numbers (SEC-003)
-                    if (ImageOperations.is_supported_format(input_path)) {
-                        var file_ext = get_file_extension(input_path);
-                        if (file_ext != "" && !MagicNumberValidator.validate_format(input_path, file_ext)) {
-                            var error_msg = MagicNumberValidator.get_validation_error_message(input_path, file_ext);
-                            throw new FileError.FAILED(error_msg);
-                        }
-                    }
-
-                    // Check if output directory exists
-                    var dir = File.new_for_path(output_dir);
-                    if (!dir.query_exists()) {
-                        throw new FileError.NOENT(_("Output directory does not exist"));
-                    }
 
-                    // Save clean copy
-                    if (ImageOperations.save_clean_copy(input_path, output_path)) {
-                        results.append(new BatchResult(input_path, output_path, true));
-                    } else {
-                        results.append(new BatchResult(input_path, output_path, false, _("Save operation failed")));
-                    }
-                } catch (Error e) {
-                    // Sanitize error message to prevent path disclosure
-                    var safe_msg = FileValidator.sanitize_error_message(e.message);
-                    results.append(new BatchResult(input_path, output_path, false, safe_msg));
+                string format;
+                var candidate = ImageOperations.get_output_path(
+                    Path.build_filename(output_dir, "%s_clean%s".printf(name, ext)), out format);
+                for (int n = 2; Path.get_basename(candidate).down() in taken; n++) {
+                    candidate = ImageOperations.get_output_path(
+                        Path.build_filename(output_dir, "%s_clean_%d%s".printf(name, n, ext)), out format);
                 }
+                taken.add(Path.get_basename(candidate).down());
+                output_paths[i] = candidate;
             }
 
-            return results;
+            return output_paths;
+        }
+
+        /**
+         * Process a single image of a batch
+         *
+         * Safe to call from a worker thread: it only touches the files involved
+         * and objects it creates itself.
+         *
+         * @param input_path Input image path
+         * @param output_path Path to save the processed image, unique in the batch
+         * @return Batch result for this file
+         */
+        private static BatchResult process_file(string input_path, string output_path) {
+            // Process the image; the save validates the input format and
+            // the output directory itself, so the files are checked once
+            try {
+                var saved_path = ImageOperations.write_clean_copy(input_path, output_path);
+                return new BatchResult(input_path, saved_path, true);
+            } catch (Error e) {
+                // Sanitize error message to prevent path disclosure
+                var safe_msg = FileValidator.sanitize_error_message(e.message);
+                return new BatchResult(input_path, output_path, false, safe_msg);
+            }
         }
 
         /**
@@ -157,31 +295,5 @@ namespace Scramble {
 
             return report.str;
         }
-
-        /**
-         * Get file extension from path
-         *
-         * @param path File path
-         * @return File extension (e.g., "jpg", "png") without the dot
-         */
-        private static string get_file_extension(string path) {
-            var lower = path.down();
-            if (lower.has_suffix(".jpg")) return "jpg";
-            if (lower.has_suffix(".jpeg")) return "jpeg";
-            if (lower.has_suffix(".png")) return "png";
-            if (lower.has_suffix(".webp")) return "webp";
-            if (lower.has_suffix(".tif")) return "tif";
-            if (lower.has_suffix(".tiff")) return "tiff";
-            if (lower.has_suffix(".heif")) return "heif";
-            if (lower.has_suffix(".heic")) return "heic";
-
-            // Fallback: extract extension after last dot
-            var parts = path.split(".");
-            if (parts.length > 1) {
-                return parts[parts.length - 1].down();
-            }
-
-            return "";
-        }
     }
 }
@@ -1,11 +1,13 @@
-using Gdk;
-
 namespace Scramble {
     /**
      * Handles image file operations and format conversions
      */
     public class ImageOperations : Object {
 
+        // Shared settings object, created on first save (saves run on worker threads)
+        private static GLib.Settings? shared_settings = null;
+        private static Mutex settings_lock;
+
         /**
          * Check if a file format is supported
          *
@@ -13,11 +15,206 @@ namespace Scramble {
          * @return true if format is supported
          */
         public static bool is_supported_format(string path) {
-            var lower = path.down();
-            return lower.has_suffix(".jpg") || lower.has_suffix(".jpeg") ||
-                   lower.has_suffix(".png") || lower.has_suffix(".webp") ||
-                   lower.has_suffix(".tif") || lower.has_suffix(".tiff") ||
-                   lower.has_suffix(".heif") || lower.has_suffix(".heic");
+            return get_file_extension(path) in Constants.SUPPORTED_EXTENSIONS;
+        }
+
+        /**
+         * Get file extension from path
+         *
+         * Only the part after the last dot is copied and lowercased, so the
+         * directory part of the path is never scanned.
+         *
+         * @param path File path
+         * @return Lowercase file extension (e.g., "jpg", "png") without the dot,
+         *         or "" if the file name has none
+         */
+        public static string get_file_extension(string path) {
+            var dot = path.last_index_of_char('.');
+            if (dot < 0 || path.index_of_char('/', dot) >= 0) {
+                return "";
+            }
+            return path.substring(dot + 1).down();
+        }
+
+        /**
+         * Read image dimensions from the file header without decoding pixels
+         *
+         * Streams the file into a GdkPixbuf loader and stops reading as soon as
+         * the loader reports the image size. Incremental loaders (JPEG, PNG,
+         * WebP) only read their header. The TIFF loader buffers the whole file
+         * and parses it on close, so TIFF is read in full, but no loader
+         * decodes any pixels (see read_stream_dimensions()).
+         *
+         * @param path Image file path
+         * @param width Image width in pixels
+         * @param height Image height in pixels
+         * @return true if the dimensions could be determined
+         */
+        public static bool read_dimensions(string path, out int width, out int height) {
+            try {
+                // Stream for Flatpak portal compatibility (avoids FUSE path issues)
+                var stream = GLib.File.new_for_path(path).read();
+                var found = read_stream_dimensions(stream, out width, out height);
+                stream.close();
+                return found;
+            } catch (Error e) {
+                debug("Dimension probe failed: %s", e.message);
+                width = 0;
+                height = 0;
+                return false;
+            }
+        }
+
+        /**
+         * Read image dimensions from an already opened stream
+         *
+         * Lets callers that opened the file for other reasons (such as
+         * querying its size) probe the header without opening it again.
+         * The stream is read from its current position and is not closed.
+         *
+         * @param stream Input stream positioned at the start of the image
+         * @param width Image width in pixels
+         * @param height Image height in pixels
+         * @return true if the dimensions could be determined
+         */
+        public static bool read_stream_dimensions(InputStream stream, out int width, out int height) {
+            int probed_width = 0;
+            int probed_height = 0;
+            bool prepared = false;
+
+            var loader = new Gdk.PixbufLoader();
+            loader.size_prepared.connect((w, h) => {
+                probed_width = w;
+                probed_height = h;
+                prepared = true;
+
+                // Ask for a zero-sized image so the loader stops after the
+                // header instead of decoding (as gdk_pixbuf_get_file_info does)
+                loader.set_size(0, 0);
+            });
+
+            try {
+                var buffer = new uint8[Constants.DIMENSION_PROBE_CHUNK_SIZE];
+                size_t bytes_read;
+
+                while (!prepared) {
+                    stream.read_all(buffer, out bytes_read);
+                    if (bytes_read == 0) {
+                        break;
+                    }
+                    loader.write(buffer[0:(int) bytes_read]);
+                    if (bytes_read < buffer.length) {
+                        break;
+                    }
+                }
+            } catch (Error e) {
+                debug("Dimension probe failed: %s", e.message);
+            }
+
+            try {
+                loader.close();
+            } catch (Error e) {
+                // Expected: the loader stopped at the header or was cut short
+            }
+
+            width = probed_width;
+            height = probed_height;
+            return prepared && probed_width > 0 && probed_height > 0;
+        }
+
+        /**
+         * Decode a downscaled, correctly oriented preview of an image
+         *
+         * The loader is asked for the reduced size as soon as the header is
+         * read, so JPEG decodes at a fraction of full resolution instead of
+         * decoding everything and scaling afterwards. Images already smaller
+         * than max_size are kept at their own size. Safe to call from a
+         * worker thread.
+         *
+         * @param path Image file path
+         * @param max_size Maximum width and height of the preview
+         * @return Preview texture
+         * @throws Error if the image cannot be decoded
+         */
+        public static Gdk.Texture load_preview(string path, int max_size) throws Error {
+            var loader = new Gdk.PixbufLoader();
+            var size_handler = loader.size_prepared.connect((w, h) => {
+                if (w > max_size || h > max_size) {
+                    var scale = double.min((double) max_size / w, (double) max_size / h);
+                    loader.set_size(int.max(1, (int) (w * scale)), int.max(1, (int) (h * scale)));
+                }
+            });
+
+            // Stream for Flatpak portal compatibility (avoids FUSE path issues)
+            var stream = GLib.File.new_for_path(path).read();
+            try {
+                var buffer = new uint8[Constants.DIMENSION_PROBE_CHUNK_SIZE];
+                size_t bytes_read;
+                do {
+                    stream.read_all(buffer, out bytes_read);
+                    if (bytes_read > 0) {
+                        loader.write(buffer[0:(int) bytes_read]);
+                    }
+                } while (bytes_read == buffer.length);
+            } finally {
+                stream.close();
+                // The handler references the loader; disconnect to free both
+                loader.disconnect(size_handler);
+                loader.close();
+            }
+
+            var pixbuf = loader.get_pixbuf();
+            if (pixbuf == null) {
+                throw new FileError.FAILED(_("Cannot decode image"));
+            }
+            pixbuf = pixbuf.apply_embedded_orientation() ?? pixbuf;
+
+            return new Gdk.MemoryTexture(
+                pixbuf.width,
+                pixbuf.height,
+                pixbuf.has_alpha ? Gdk.MemoryFormat.R8G8B8A8 : Gdk.MemoryFormat.R8G8B8,
+                pixbuf.read_bytes(),
+                pixbuf.rowstride
+            );
+        }
+
+        /**
+         * Reject images whose header declares more pixels than we will decode
+         *
+         * Only the header is parsed and no pixels are decoded, so this is
+         * cheap to run before any full decode (TIFF files are still read in
+         * full by their loader). Images whose size cannot be probed are left
+         * to the decoder.
+         *
+         * @param path Image file path
+         * @throws FileError if the image exceeds Constants.MAX_IMAGE_PIXELS
+         */
+        public static void check_pixel_limit(string path) throws FileError {
+            int width, height;
+            if (read_dimensions(path, out width, out height)) {
+                enforce_pixel_limit(width, height);
+            }
+        }
+
+        /**
+         * Reject an image whose header, read from an open stream, is too large
+         *
+         * @param stream Input stream positioned at the start of the image
+         * @throws FileError if the image exceeds Constants.MAX_IMAGE_PIXELS
+         */
+        public static void check_stream_pixel_limit(InputStream stream) throws FileError {
+            int width, height;
+            if (read_stream_dimensions(stream, out width, out height)) {
+                enforce_pixel_limit(width, height);
+            }
+        }
+
+        private static void enforce_pixel_limit(int width, int height) throws FileError {
+            if ((int64) width * height > Constants.MAX_IMAGE_PIXELS) {
+                warning("Image dimensions %d×%d exceed pixel limit", width, height);
+                throw new FileError.FAILED(_("Image too large (max %s megapixels)")
+                    .printf((Constants.MAX_IMAGE_PIXELS / 1000000).to_string()));
+            }
         }
 
         /**
@@ -29,112 +226,144 @@ namespace Scramble {
          */
         public static bool save_clean_copy(string in_path, string out_path) {
             try {
-                debug("save_clean_copy: input=%s, output=%s", in_path, out_path);
+                write_clean_copy(in_path, out_path);
+                return true;
+            } catch (Error e) {
+                warning("Save failed: %s", e.message);
+                return false;
+            }
+        }
 
-                // Validate input path
-                FileValidator.validate_path(in_path);
+        /**
+         * Save a clean copy, reporting why it failed
+         *
+         * Runs the same input and output validation as save_clean_copy(),
+         * so callers need not validate the files themselves first. The file
+         * written can differ from out_path: TIFF is saved as PNG, and a name
+         * without an image extension gets ".jpg".
+         *
+         * @param in_path Source image path
+         * @param out_path Destination path for clean image
+         * @return Path actually written
+         * @throws Error describing the validation or save failure
+         */
+        public static string write_clean_copy(string in_path, string out_path) throws Error {
+            debug("save_clean_copy: input=%s, output=%s", in_path, out_path);
 
-                // Validate output path (basic checks only - don't check file size)
-                FileValidator.validate_output_path(out_path);
+            // Validate input path
+            FileValidator.validate_path(in_path);
 
-                // Validate format by magic numbers (SEC-003)
-                var ext = get_file_extension(in_path);
-                if (!MagicNumberValidator.validate_format(in_path, ext)) {
-                    var error_msg = MagicNumberValidator.get_validation_error_message(in_path, ext);
-                    warning("Format validation failed: %s", error_msg);
-                    throw new FileError.FAILED(error_msg);
-                }
+            // Determine output format and the path actually written, once
+            string format;
+            var final_out_path = get_output_path(out_path, out format);
+
+            // Validate output path (basic checks only - don't check file size)
+            FileValidator.validate_output_path(final_out_path, in_path);
 
-                debug("Validation passed, loading image...");
-
-                // Get settings to check metadata removal preferences
-                var settings = new GLib.Settings(Config.APP_ID);
-                
-                // Determine output format from file extension
-                string format = infer_image_type(out_path);
-                
-                // Ensure output path has correct extension
-                string final_out_path = ensure_extension(out_path, format);
-                
+            // Validate format by magic numbers (SEC-003)
+            var ext = get_file_extension(in_path);
+            if (!MagicNumberValidator.validate_format(in_path, ext)) {
+                var error_msg = MagicNumberValidator.get_validation_error_message(in_path, ext);
+                warning("Format validation failed: %s", error_msg);
+                throw new FileError.FAILED(error_msg);
+            }
+
+            debug("Validation passed, loading image...");
+
+            // Get settings to check metadata removal preferences
+            var settings = get_settings();
+            
 #if HAVE_GEXIV2
-                // Check if we need selective metadata removal
-                if (!MetadataFilter.is_remove_all(settings)) {
-                    // Use GExiv2-based approach for selective removal
-                    return save_with_selective_metadata(in_path, final_out_path, format, settings);
-                }
-#endif
-                
-                // Default: Use GdkPixbuf approach to strip ALL metadata (fastest)
-                return save_stripped(in_path, final_out_path, format, settings);
-                
-            } catch (Error e) {
-                warning("Save failed: %s", e.message);
-                return false;
+            // Check if we need selective metadata removal
+            if (!MetadataFilter.is_remove_all(settings)) {
+                // Use GExiv2-based approach for selective removal
+                return save_with_selective_metadata(in_path, final_out_path, format, settings);
             }
+#endif
+            
+            // Default: Use GdkPixbuf approach to strip ALL metadata (fastest)
+            return save_stripped(in_path, final_out_path, format, settings);
         }
         
         /**
-         * Save image with all metadata stripped using GdkPixbuf
-         * This is the fastest approach when removing all metadata
+         * Get the path and format a clean copy saved to out_path is written as
+         *
+         * The format follows the extension. TIFF cannot be written to a
+         * stream for portals, so it is saved as PNG (lossless) next to the
+         * requested path, and a name without an image extension gets ".jpg".
+         *
+         * @param out_path Requested destination path
+         * @param format Image type written: "jpeg", "png" or "webp"
+         * @return Path actually written
          */
-        private static bool save_stripped(string in_path, string out_path, string format, GLib.Settings settings) throws Error {
-#if HAVE_GEXIV2
-            // For JPEG, copy the file and strip metadata with GExiv2 to avoid
-            // re-encoding at a fixed quality (which can increase file size)
-            if (format == "jpeg") {
-                return save_jpeg_strip_all(in_path, out_path, settings);
+        public static string get_output_path(string out_path, out string format) {
+            var ext = get_file_extension(out_path);
+            var type = image_type_for_extension(ext);
+            if (type == null) {
+                format = "jpeg";
+                return out_path + ".jpg";
             }
-#endif
-            // Load via stream for Flatpak portal compatibility (avoids FUSE path issues)
-            var in_file = GLib.File.new_for_path(in_path);
-            var in_stream = in_file.read();
-            var pixbuf = new Gdk.Pixbuf.from_stream(in_stream);
-            in_stream.close();
-            debug("Image loaded: %dx%d", pixbuf.get_width(), pixbuf.get_height());
-
-            // Save without any metadata using GFile for Flatpak portal compatibility
-            debug("Saving as %s to: %s", format, out_path);
+            if (type == "tiff") {
+                format = "png";
+                return out_path.substring(0, out_path.length - ext.length) + "png";
+            }
+            format = type;
+            return out_path;
+        }
 
-            // Use GFile-based save for portal compatibility
-            var out_file = GLib.File.new_for_path(out_path);
-            var output_stream = out_file.replace(null, false, GLib.FileCreateFlags.NONE);
+        /**
+         * Save a clean copy on a worker thread
+         *
+         * Decoding, re-encoding and metadata rewriting can take a noticeable
+         * time for large images, so interactive callers use this variant to
+         * keep the main loop responsive.
+         *
+         * @param in_path Source image path
+         * @param out_path Destination path
+         * @return Path actually written, or null if the save failed
+         */
+        public static async string? save_clean_copy_async(string in_path, string out_path) {
+            string? saved_path = null;
+            SourceFunc resume = save_clean_copy_async.callback;
+
+            new Thread<bool>("clean-copy", () => {
+                try {
+                    saved_path = write_clean_copy(in_path, out_path);
+                } catch (Error e) {
+                    warning("Save failed: %s", e.message);
+                }
+                Idle.add((owned) resume);
+                return saved_path != null;
+            });
+            yield;
 
-            // Save with appropriate format
-            if (format == "jpeg") {
-                debug("Saving as JPEG");
-                pixbuf.save_to_streamv(output_stream, "jpeg", {"quality"}, {"95"});
-            } else if (format == "png") {
-                debug("Saving as PNG");
-                pixbuf.save_to_streamv(output_stream, "png", null, null);
-            } else if (format == "webp") {
-                debug("Saving as WebP");
-                pixbuf.save_to_streamv(output_stream, "webp", {"quality"}, {"95"});
-            } else if (format == "tiff") {
-                // TIFF not supported with save_to_streamv, convert to PNG (lossless)
-                warning("TIFF format not supported with portals, converting to PNG");
-                output_stream.close();
+            return saved_path;
+        }
 
-                // Change extension to .png
-                var png_path = out_path.replace(".tiff", ".png").replace(".tif", ".png");
-
-                var png_file = GLib.File.new_for_path(png_path);
-                var png_stream = png_file.replace(null, false, GLib.FileCreateFlags.NONE);
-                pixbuf.save_to_streamv(png_stream, "png", null, null);
-                png_stream.close();
-                debug("Saved as PNG: %s", png_path);
-                
-                // Secure memory clearing if enabled
-                if (SecureMemory.is_enabled(settings)) {
-                    SecureMemory.clear_pixbuf(pixbuf);
-                }
-                return true;
-            } else {
-                // Default to JPEG if format is unknown
-                debug("Unknown format, defaulting to JPEG");
-                pixbuf.save_to_streamv(output_stream, "jpeg", {"quality"}, {"95"});
+        /**
+         * Save image with all metadata stripped using GdkPixbuf
+         * This is the fastest approach when removing all metadata
+         */
+        private static string save_stripped(string in_path, string out_path, string format, GLib.Settings settings) throws Error {
+            // JPEG to JPEG: drop the metadata segments and copy the rest byte
+            // for byte, with no decode, re-encode or quality loss
+            var in_ext = get_file_extension(in_path);
+            if (format == "jpeg" && (in_ext == "jpg" || in_ext == "jpeg")) {
+                var removed = JpegMetadataStripper.strip(in_path, out_path);
+                debug("JPEG saved with %d metadata segments removed: %s", removed, out_path);
+                return out_path;
             }
-
-            output_stream.close();
+#if HAVE_GEXIV2
+            // For WebP to WebP, copy the file and strip metadata with GExiv2 to
+            // avoid a full decode and lossy re-encode at a fixed quality (which
+            // is slow on large images and can increase file size). Any other
+            // source must be converted, so it falls through to the re-encode.
+            if (format == "webp" && in_ext == "webp") {
+                return save_copy_strip_all(in_path, out_path, format, settings);
+            }
+#endif
+            var pixbuf = decode_image(in_path);
+            encode_image(pixbuf, out_path, format);
             debug("Save completed successfully");
 
             // Secure memory clearing if enabled
@@ -142,15 +371,16 @@ namespace Scramble {
                 SecureMemory.clear_pixbuf(pixbuf);
             }
 
-            return true;
+            return out_path;
         }
         
 #if HAVE_GEXIV2
         /**
-         * Strip all metadata from a JPEG by copying the file and clearing metadata
-         * with GExiv2. This avoids re-encoding, preserving original compression quality.
+         * Strip all metadata from a WebP by copying the file and clearing
+         * metadata with GExiv2. This avoids decoding and re-encoding the pixels,
+         * preserving original compression quality.
          */
-        private static bool save_jpeg_strip_all(string in_path, string out_path, GLib.Settings settings) throws Error {
+        private static string save_copy_strip_all(string in_path, string out_path, string format, GLib.Settings settings) throws Error {
             var src = GLib.File.new_for_path(in_path);
             var dst = GLib.File.new_for_path(out_path);
             src.copy(dst, GLib.FileCopyFlags.OVERWRITE, null, null);
@@ -161,17 +391,28 @@ namespace Scramble {
             metadata.clear_xmp();
             metadata.clear_comment();
             metadata.save_file(out_path);
-            debug("JPEG metadata stripped without re-encoding: %s", out_path);
-            return true;
+            debug("%s metadata stripped without re-encoding: %s", format.up(), out_path);
+            return out_path;
         }
 
         /**
          * Save image with selective metadata removal using GExiv2
          * Used when user wants to preserve some metadata categories
          */
-        private static bool save_with_selective_metadata(string in_path, string out_path, string format, GLib.Settings settings) throws Error {
+        private static string save_with_selective_metadata(string in_path, string out_path, string format, GLib.Settings settings) throws Error {
             debug("Using selective metadata removal");
 
+            // Nothing to remove and no conversion needed: a plain copy is the result.
+            // The source extension was checked against its magic number, and
+            // HEIF or unknown sources map to no type, so they are converted
+            if (MetadataFilter.is_keep_all(settings) &&
+                image_type_for_extension(get_file_extension(in_path)) == format) {
+                GLib.File.new_for_path(in_path).copy(
+                    GLib.File.new_for_path(out_path), GLib.FileCopyFlags.OVERWRITE, null, null);
+                debug("All metadata kept, copied unchanged: %s", out_path);
+                return out_path;
+            }
+
             // For JPEG, copy and patch metadata without re-encoding
             if (format == "jpeg") {
                 var src = GLib.File.new_for_path(in_path);
@@ -182,17 +423,16 @@ namespace Scramble {
                 metadata.open_path(out_path);
                 int removed = MetadataFilter.apply_filter(metadata, settings);
                 debug("Removed %d metadata tags based on filter settings", removed);
-                metadata.save_file(out_path);
+                // The copy already holds the right metadata if nothing matched
+                if (removed > 0) {
+                    metadata.save_file(out_path);
+                }
                 debug("JPEG saved with selective metadata (no re-encoding): %s", out_path);
-                return true;
+                return out_path;
             }
 
-            // For other formats, load via stream (Flatpak portal compatibility)
-            var in_file = GLib.File.new_for_path(in_path);
-            var in_stream = in_file.read();
-            var pixbuf = new Gdk.Pixbuf.from_stream(in_stream);
-            in_stream.close();
-            debug("Image loaded: %dx%d", pixbuf.get_width(), pixbuf.get_height());
+            // For other formats, decode and re-encode with the filtered metadata
+            var pixbuf = decode_image(in_path);
 
             // Load metadata from original file
             var metadata2 = new GExiv2.Metadata();
@@ -203,32 +443,7 @@ namespace Scramble {
             debug("Removed %d metadata tags based on filter settings", removed2);
 
             // Save the image first (without metadata)
-            var out_file = GLib.File.new_for_path(out_path);
-            var output_stream = out_file.replace(null, false, GLib.FileCreateFlags.NONE);
-
-            if (format == "png") {
-                pixbuf.save_to_streamv(output_stream, "png", null, null);
-            } else if (format == "webp") {
-                pixbuf.save_to_streamv(output_stream, "webp", {"quality"}, {"95"});
-            } else if (format == "tiff") {
-                warning("TIFF format not supported with portals, converting to PNG");
-                output_stream.close();
-                var png_path = out_path.replace(".tiff", ".png").replace(".tif", ".png");
-                var png_file = GLib.File.new_for_path(png_path);
-                var png_stream = png_file.replace(null, false, GLib.FileCreateFlags.NONE);
-                pixbuf.save_to_streamv(png_stream, "png", null, null);
-                png_stream.close();
-                metadata2.save_file(png_path);
-                debug("Saved PNG with selective metadata: %s", png_path);
-                if (SecureMemory.is_enabled(settings)) {
-                    SecureMemory.clear_pixbuf(pixbuf);
-                }
-                return true;
-            } else {
-                pixbuf.save_to_streamv(output_stream, "png", null, null);
-            }
-
-            output_stream.close();
+            encode_image(pixbuf, out_path, format);
 
             // Write the filtered metadata back to the saved file
             metadata2.save_file(out_path);
@@ -238,83 +453,108 @@ namespace Scramble {
                 SecureMemory.clear_pixbuf(pixbuf);
             }
 
-            return true;
+            return out_path;
         }
 #endif
 
         /**
-         * Ensure file path has correct extension for format
+         * Decode an image for re-encoding
+         *
+         * Reads via a stream for Flatpak portal compatibility (avoids FUSE
+         * path issues), after refusing images over the pixel limit.
+         *
+         * @param in_path Source image path
+         * @return Decoded pixels
+         * @throws Error if the image is too large or cannot be decoded
          */
-        private static string ensure_extension(string path, string format) {
-            string expected_ext = "";
+        private static Gdk.Pixbuf decode_image(string in_path) throws Error {
+            check_pixel_limit(in_path);
+
+            var in_stream = GLib.File.new_for_path(in_path).read();
+            Gdk.Pixbuf pixbuf;
+            try {
+                pixbuf = new Gdk.Pixbuf.from_stream(in_stream);
+            } finally {
+                in_stream.close();
+            }
+            debug("Image loaded: %dx%d", pixbuf.get_width(), pixbuf.get_height());
+            return pixbuf;
+        }
+
+        /**
+         * Encode pixels to a file without any metadata
+         *
+         * Saves through a GFile stream for portal compatibility.
+         *
+         * @param pixbuf Pixels to encode
+         * @param out_path Destination path from get_output_path()
+         * @param format Output format from get_output_path()
+         * @throws Error if the file cannot be written
+         */
+        private static void encode_image(Gdk.Pixbuf pixbuf, string out_path, string format) throws Error {
+            string type;
+            string[] keys = {};
+            string[] values = {};
+
             switch (format) {
-                case "jpeg":
-                    expected_ext = ".jpg";
-                    break;
                 case "png":
-                    expected_ext = ".png";
+                    type = "png";
                     break;
                 case "webp":
-                    expected_ext = ".webp";
-                    break;
-                case "tiff":
-                    expected_ext = ".tiff";
+                    type = "webp";
+                    keys = {"quality"};
+                    values = {Constants.WEBP_QUALITY.to_string()};
                     break;
                 default:
-                    expected_ext = ".jpg";
+                    type = "jpeg";
+                    keys = {"quality"};
+                    values = {Constants.JPEG_QUALITY.to_string()};
                     break;
             }
 
-            var lower = path.down();
-            if (format == "jpeg" && (lower.has_suffix(".jpg") || lower.has_suffix(".jpeg"))) {
-                return path;
-            } else if (format == "png" && lower.has_suffix(".png")) {
-                return path;
-            } else if (format == "webp" && lower.has_suffix(".webp")) {
-                return path;
-            } else if (format == "tiff" && (lower.has_suffix(".tif") || lower.has_suffix(".tiff"))) {
-                return path;
+            debug("Saving as %s to: %s", type, out_path);
+            var output_stream = GLib.File.new_for_path(out_path).replace(null, false, GLib.FileCreateFlags.NONE);
+            try {
+                pixbuf.save_to_streamv(output_stream, type, keys, values);
+            } finally {
+                output_stream.close();
             }
-
-            return path + expected_ext;
         }
 
         /**
-         * Infer image type from file extension
+         * Get the application settings, creating them once
          */
-        private static string infer_image_type(string path) {
-            var lower = path.down();
-            if (lower.has_suffix(".jpg") || lower.has_suffix(".jpeg")) return "jpeg";
-            if (lower.has_suffix(".png")) return "png";
-            if (lower.has_suffix(".webp")) return "webp";
-            if (lower.has_suffix(".tif") || lower.has_suffix(".tiff")) return "tiff";
-            return "jpeg";
+        private static GLib.Settings get_settings() {
+            settings_lock.lock();
+            if (shared_settings == null) {
+                shared_settings = new GLib.Settings(Config.APP_ID);
+            }
+            var result = shared_settings;
+            settings_lock.unlock();
+            return result;
         }
 
         /**
-         * Get file extension from path
+         * Map a lowercase file extension to the image type it is saved as
          *
-         * @param path File path
-         * @return File extension (e.g., "jpg", "png") without the dot
+         * @param ext Extension from get_file_extension()
+         * @return "jpeg", "png", "webp" or "tiff", or null for other extensions
          */
-        private static string get_file_extension(string path) {
-            var lower = path.down();
-            if (lower.has_suffix(".jpg")) return "jpg";
-            if (lower.has_suffix(".jpeg")) return "jpeg";
-            if (lower.has_suffix(".png")) return "png";
-            if (lower.has_suffix(".webp")) return "webp";
-            if (lower.has_suffix(".tif")) return "tif";
-            if (lower.has_suffix(".tiff")) return "tiff";
-            if (lower.has_suffix(".heif")) return "heif";
-            if (lower.has_suffix(".heic")) return "heic";
-
-            // Fallback: extract extension after last dot
-            var parts = path.split(".");
-            if (parts.length > 1) {
-                return parts[parts.length - 1].down();
+        private static string? image_type_for_extension(string ext) {
+            switch (ext) {
+                case "jpg":
+                case "jpeg":
+                    return "jpeg";
+                case "png":
+                    return "png";
+                case "webp":
+                    return "webp";
+                case "tif":
+                case "tiff":
+                    return "tiff";
+                default:
+                    return null;
             }
-
-            return "";
         }
     }
 }
@@ -0,0 +1,125 @@
+#if HAVE_GEXIV2
+using GLib;
+
+namespace Scramble {
+    /**
+     * Caches parsed image metadata so the same file is not re-parsed
+     *
+     * Entries are keyed by path and validated against the file's fingerprint,
+     * so a file that changed or was replaced on disk is parsed again.
+     * The least recently used entry is evicted once the cache is full.
+     * Safe to call from worker threads. Cached objects are shared: callers
+     * must only read from them.
+     */
+    public class MetadataCache : Object {
+
+        private class Entry {
+            public string path;
+            public string stamp;
+            public GExiv2.Metadata metadata;
+
+            // Recency list links: head is least recently used
+            public unowned Entry? prev = null;
+            public Entry? next = null;
+
+            public Entry(string path, string stamp, GExiv2.Metadata metadata) {
+                this.path = path;
+                this.stamp = stamp;
+                this.metadata = metadata;
+            }
+        }
+
+        private static HashTable<string, Entry>? entries = null;
+        private static Entry? head = null;
+        private static unowned Entry? tail = null;
+
+        // Guards the table and recency list; images load on worker threads
+        private static Mutex cache_lock;
+
+        /**
+         * Get parsed metadata for a file, parsing it only if needed
+         *
+         * @param path Image file path
+         * @return Parsed metadata (read-only, shared with other callers)
+         * @throws Error if the file cannot be read or parsed
+         */
+        public static GExiv2.Metadata open(string path) throws Error {
+            var stamp = FileValidator.get_fingerprint(path);
+
+            cache_lock.lock();
+            try {
+                if (entries == null) {
+                    entries = new HashTable<string, Entry>(str_hash, str_equal);
+                }
+
+                var cached = entries.lookup(path);
+                if (cached != null && cached.stamp == stamp) {
+                    // Mark as most recently used
+                    unlink(cached);
+                    append(cached);
+                    return cached.metadata;
+                }
+            } finally {
+                cache_lock.unlock();
+            }
+
+            // Parse without holding the lock so other lookups are not blocked
+            var metadata = new GExiv2.Metadata();
+            metadata.open_path(path);
+
+            cache_lock.lock();
+            try {
+                var cached = entries.lookup(path);
+                if (cached != null) {
+                    unlink(cached);
+                }
+                var entry = new Entry(path, stamp, metadata);
+                entries.replace(path, entry);
+                append(entry);
+
+                // Evict the least recently used entries once over the limit
+                while (entries.size() > Constants.METADATA_CACHE_SIZE) {
+                    Entry oldest = head;
+                    unlink(oldest);
+                    entries.remove(oldest.path);
+                }
+            } finally {
+                cache_lock.unlock();
+            }
+
+            return metadata;
+        }
+
+        /**
+         * Detach an entry from the recency list
+         */
+        private static void unlink(Entry entry) {
+            if (entry.prev != null) {
+                entry.prev.next = entry.next;
+            } else {
+                head = entry.next;
+            }
+            if (entry.next != null) {
+                entry.next.prev = entry.prev;
+            } else {
+                tail = entry.prev;
+            }
+            entry.prev = null;
+            entry.next = null;
+        }
+
+        /**
+         * Attach an entry at the most recently used end of the list
+         */
+        private static void append(Entry entry) {
+            entry.prev = tail;
+            if (tail != null) {
+                tail.next = entry;
+            } else {
+                head = entry;
+            }
+            tail = entry;
+        }
+    }
+}
+#endif
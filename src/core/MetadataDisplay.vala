@@ -1,12 +1,17 @@
 using Gtk;
 using Adw;
-using Gdk;
 
 namespace Scramble {
     /**
      * Handles metadata display and management for images
      */
     public class MetadataDisplay : Object {
+        private const int64 KIB = 1024;
+        private const int64 MIB = 1024 * 1024;
+
+        // Most raw rows removed by a clear that are kept for reuse
+        private const uint MAX_SPARE_RAW_ROWS = 256;
+
         private Gtk.ListBox metadata_list;
 
         // Predefined metadata rows
@@ -20,6 +25,17 @@ namespace Scramble {
         // Raw metadata section
         private Adw.ExpanderRow raw_metadata_row;
 
+        // Raw tags collected for the current image; rows are only built on first expand
+        private string[] raw_tags = {};
+        private string[] raw_values = {};
+        private bool raw_rows_built = false;
+
+        // Rows currently added to the expander, so clearing can remove just those
+        private GenericArray<MetadataRow> raw_rows = new GenericArray<MetadataRow>();
+
+        // Rows removed from the expander, reused instead of building new widgets
+        private GenericArray<MetadataRow> spare_raw_rows = new GenericArray<MetadataRow>();
+
         public MetadataDisplay(Gtk.ListBox list) {
             metadata_list = list;
             setup_metadata_rows();
@@ -54,14 +70,59 @@ namespace Scramble {
             metadata_list.append(location_row);
 
             // Add expandable raw metadata section
-            raw_metadata_row = new Adw.ExpanderRow();
-            raw_metadata_row.set_title(_("Raw Metadata"));
-            raw_metadata_row.set_subtitle(_("Complete EXIF, XMP, and IPTC data"));
-            raw_metadata_row.add_prefix(new Gtk.Image.from_icon_name("text-x-generic-symbolic"));
-            raw_metadata_row.enable_expansion = false;
+            raw_metadata_row = create_raw_metadata_row();
             metadata_list.append(raw_metadata_row);
         }
 
+        /**
+         * Create the collapsed raw metadata expander
+         */
+        private Adw.ExpanderRow create_raw_metadata_row() {
+            var row = new Adw.ExpanderRow();
+            row.set_title(_("Raw Metadata"));
+            row.set_subtitle(_("Complete EXIF, XMP, and IPTC data"));
+            row.add_prefix(new Gtk.Image.from_icon_name("text-x-generic-symbolic"));
+            row.enable_expansion = false;
+            row.notify["expanded"].connect(on_raw_metadata_expanded);
+            return row;
+        }
+
+        /**
+         * Build the raw metadata rows the first time the section is opened
+         *
+         * Images can carry hundreds of tags, so creating one widget per tag
+         * is deferred until the user actually looks at them.
+         */
+        private void on_raw_metadata_expanded() {
+            if (!raw_metadata_row.expanded || raw_rows_built) {
+                return;
+            }
+            raw_rows_built = true;
+
+            for (int i = 0; i < raw_tags.length; i++) {
+                var row = take_raw_row(raw_tags[i], raw_values[i]);
+                raw_metadata_row.add_row(row);
+                raw_rows.add(row);
+            }
+        }
+
+        /**
+         * Get a row for a raw tag, reusing a spare one when available
+         *
+         * Building a row instantiates its template and accessible object,
+         * so browsing image after image recycles the previous image's rows.
+         */
+        private MetadataRow take_raw_row(string tag, string value) {
+            if (spare_raw_rows.length == 0) {
+                return new MetadataRow(tag, value);
+            }
+
+            var row = spare_raw_rows.steal_index_fast(spare_raw_rows.length - 1);
+            row.title = tag;
+            row.update_value(value);
+            return row;
+        }
+
         /**
          * Update metadata display with image file information
          *
@@ -77,28 +138,26 @@ namespace Scramble {
          */
         private void update_basic_info(string path) {
             try {
-                var texture = Gdk.Texture.from_file(GLib.File.new_for_path(path));
-                var f = GLib.File.new_for_path(path);
-                var info = f.query_info("standard::size", GLib.FileQueryInfoFlags.NONE);
-                var size = info.get_size();
+                // Open once: the same stream answers the size query and the header probe
+                var stream = GLib.File.new_for_path(path).read();
+                var info = stream.query_info("standard::size");
 
                 // Update filename
                 filename_row.update_value(GLib.Path.get_basename(path));
 
                 // Update file size
-                string size_str;
-                if (size < 1024) {
-                    size_str = "%s bytes".printf(size.to_string());
-                } else if (size < 1024*1024) {
-                    size_str = "%.1f KB".printf(size/1024.0);
+                filesize_row.update_value(format_file_size(info.get_size()));
+
+                // Update dimensions, probing the header only if Exiv2 could not
+                int width, height;
+                if (read_parsed_dimensions(path, out width, out height) ||
+                    ImageOperations.read_stream_dimensions(stream, out width, out height)) {
+                    dimensions_row.update_value("%d × %d pixels".printf(width, height));
                 } else {
-                    size_str = "%.1f MB".printf(size/(1024.0*1024.0));
+                    dimensions_row.update_value(_("Unknown"));
                 }
-                filesize_row.update_value(size_str);
-
-                // Update dimensions
-                dimensions_row.update_value("%d × %d pixels".printf(texture.get_width(), texture.get_height()));
 
+                stream.close();
             } catch (Error e) {
                 filename_row.update_value(_("Unable to read"));
                 filesize_row.update_value(_("Unknown"));
@@ -106,14 +165,55 @@ namespace Scramble {
             }
         }
 
+        /**
+         * Read image dimensions from the cached metadata parse
+         *
+         * Exiv2 reads the pixel size while parsing the header, and the parse
+         * is cached for the metadata rows, so this avoids a second header read.
+         *
+         * @param path Image file path
+         * @param width Image width in pixels
+         * @param height Image height in pixels
+         * @return true if Exiv2 reported both dimensions
+         */
+        private bool read_parsed_dimensions(string path, out int width, out int height) {
+            width = 0;
+            height = 0;
+#if HAVE_GEXIV2
+            try {
+                var m = MetadataCache.open(path);
+                width = m.get_pixel_width();
+                height = m.get_pixel_height();
+            } catch (Error e) {
+                debug("No parsed dimensions: %s", e.message);
+            }
+#endif
+            return width > 0 && height > 0;
+        }
+
+        /**
+         * Format a file size in bytes, KB or MB
+         *
+         * @param size Size in bytes
+         * @return Human-readable size
+         */
+        private static string format_file_size(int64 size) {
+            if (size < KIB) {
+                return "%s bytes".printf(size.to_string());
+            }
+            if (size < MIB) {
+                return "%.1f KB".printf(size / (double) KIB);
+            }
+            return "%.1f MB".printf(size / (double) MIB);
+        }
+
         /**
          * Update EXIF/XMP/IPTC metadata information
          */
         private void update_exif_metadata(string path) {
 #if HAVE_GEXIV2
             try {
-                var m = new GExiv2.Metadata();
-                m.open_path(path);
+                var m = MetadataCache.open(path);
 
                 // Update camera info
                 string camera_info = "";
@@ -167,64 +267,79 @@ namespace Scramble {
 #endif
         }
 
+#if HAVE_GEXIV2
         /**
          * Populate raw metadata expandable section
          */
         private void populate_raw_metadata(GExiv2.Metadata metadata) {
             clear_raw_metadata();
 
+            string[] exif_tags = {};
+            string[] xmp_tags = {};
+            string[] iptc_tags = {};
+            try {
+                exif_tags = metadata.get_exif_tags();
+                xmp_tags = metadata.get_xmp_tags();
+                iptc_tags = metadata.get_iptc_tags();
+            } catch (Error e) {
+                warning("Error listing metadata tags: %s", e.message);
+            }
+
+            // Size the buffers once for all families, then trim to what was kept
+            var capacity = exif_tags.length + xmp_tags.length + iptc_tags.length;
+            raw_tags = new string[capacity];
+            raw_values = new string[capacity];
             var tag_count = 0;
 
-            // Add EXIF tags
             try {
-                var exif_tags = metadata.get_exif_tags();
-                foreach (var tag in exif_tags) {
-                    var value = metadata.get_tag_string(tag);
-                    if (value != null && value.strip() != "") {
-                        var raw_row = new MetadataRow(tag, value.strip());
-                        raw_metadata_row.add_row(raw_row);
-                        tag_count++;
-                    }
-                }
+                collect_raw_tags(metadata, exif_tags, ref tag_count);
             } catch (Error e) {
                 warning("Error reading EXIF tags: %s", e.message);
             }
 
-            // Add XMP tags
             try {
-                var xmp_tags = metadata.get_xmp_tags();
-                foreach (var tag in xmp_tags) {
-                    var value = metadata.get_tag_string(tag);
-                    if (value != null && value.strip() != "") {
-                        var raw_row = new MetadataRow(tag, value.strip());
-                        raw_metadata_row.add_row(raw_row);
-                        tag_count++;
-                    }
-                }
+                collect_raw_tags(metadata, xmp_tags, ref tag_count);
             } catch (Error e) {
                 warning("Error reading XMP tags: %s", e.message);
             }
 
-            // Add IPTC tags
             try {
-                var iptc_tags = metadata.get_iptc_tags();
-                foreach (var tag in iptc_tags) {
-                    var value = metadata.get_tag_string(tag);
-                    if (value != null && value.strip() != "") {
-                        var raw_row = new MetadataRow(tag, value.strip());
-                        raw_metadata_row.add_row(raw_row);
-                        tag_count++;
-                    }
-                }
+                collect_raw_tags(metadata, iptc_tags, ref tag_count);
             } catch (Error e) {
                 warning("Error reading IPTC tags: %s", e.message);
             }
 
+            raw_tags.resize(tag_count);
+            raw_values.resize(tag_count);
+
             // Update subtitle and enable expansion if there are items
             raw_metadata_row.set_subtitle(_("Complete EXIF, XMP, and IPTC data (%d items)").printf(tag_count));
             raw_metadata_row.enable_expansion = (tag_count > 0);
         }
 
+        /**
+         * Collect every tag with a non-empty value for the raw section
+         *
+         * @param metadata Parsed metadata to read values from
+         * @param tags Tag names of one metadata family
+         * @param count Next free slot in the raw buffers, advanced per tag kept
+         */
+        private void collect_raw_tags(GExiv2.Metadata metadata, string[] tags, ref int count) throws Error {
+            foreach (var tag in tags) {
+                var value = metadata.get_tag_string(tag);
+                if (value == null) {
+                    continue;
+                }
+                var stripped = MetadataFilter.trim_value(value);
+                if (stripped != "") {
+                    raw_tags[count] = tag;
+                    raw_values[count] = stripped;
+                    count++;
+                }
+            }
+        }
+#endif
+
         /**
          * Clear all metadata rows
          */
@@ -242,18 +357,23 @@ namespace Scramble {
          * Clear raw metadata section
          */
         private void clear_raw_metadata() {
-            var parent = raw_metadata_row.get_parent() as Gtk.ListBox;
-            if (parent != null) {
-                parent.remove(raw_metadata_row);
+            raw_tags = {};
+            raw_values = {};
+            raw_rows_built = false;
 
-                // Create a new raw metadata row
-                raw_metadata_row = new Adw.ExpanderRow();
-                raw_metadata_row.set_title(_("Raw Metadata"));
-                raw_metadata_row.set_subtitle(_("Complete EXIF, XMP, and IPTC data"));
-                raw_metadata_row.enable_expansion = false;
+            // Reset the expander in place; it keeps its position in the list
+            raw_metadata_row.expanded = false;
+            raw_metadata_row.enable_expansion = false;
+            raw_metadata_row.set_subtitle(_("Complete EXIF, XMP, and IPTC data"));
 
-                parent.append(raw_metadata_row);
+            // Rows only exist if the section was opened for the previous image
+            foreach (var row in raw_rows) {
+                raw_metadata_row.remove(row);
+                if (spare_raw_rows.length < MAX_SPARE_RAW_ROWS) {
+                    spare_raw_rows.add(row);
+                }
             }
+            raw_rows.remove_range(0, raw_rows.length);
         }
     }
 }
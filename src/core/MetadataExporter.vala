@@ -38,58 +38,24 @@ namespace Scramble {
         public static List<MetadataEntry>? extract_metadata(string image_path) {
 #if HAVE_GEXIV2
             try {
-                var metadata = new GExiv2.Metadata();
-                metadata.open_path(image_path);
+                var metadata = MetadataCache.open(image_path);
 
                 var entries = new List<MetadataEntry>();
 
-                // Extract EXIF data
                 try {
-                    var exif_tags = metadata.get_exif_tags();
-                    foreach (var tag in exif_tags) {
-                        try {
-                            var value = metadata.get_tag_string(tag);
-                            if (value != null && value.strip() != "") {
-                                entries.append(new MetadataEntry(tag, value.strip(), "EXIF"));
-                            }
-                        } catch (Error e) {
-                            warning("Error reading EXIF tag %s: %s", tag, e.message);
-                        }
-                    }
+                    append_entries(metadata, metadata.get_exif_tags(), "EXIF", ref entries);
                 } catch (Error e) {
                     warning("Error reading EXIF tags: %s", e.message);
                 }
 
-                // Extract XMP data
                 try {
-                    var xmp_tags = metadata.get_xmp_tags();
-                    foreach (var tag in xmp_tags) {
-                        try {
-                            var value = metadata.get_tag_string(tag);
-                            if (value != null && value.strip() != "") {
-                                entries.append(new MetadataEntry(tag, value.strip(), "XMP"));
-                            }
-                        } catch (Error e) {
-                            warning("Error reading XMP tag %s: %s", tag, e.message);
-                        }
-                    }
+                    append_entries(metadata, metadata.get_xmp_tags(), "XMP", ref entries);
                 } catch (Error e) {
                     warning("Error reading XMP tags: %s", e.message);
                 }
 
-                // Extract IPTC data
                 try {
-                    var iptc_tags = metadata.get_iptc_tags();
-                    foreach (var tag in iptc_tags) {
-                        try {
-                            var value = metadata.get_tag_string(tag);
-                            if (value != null && value.strip() != "") {
-                                entries.append(new MetadataEntry(tag, value.strip(), "IPTC"));
-                            }
-                        } catch (Error e) {
-                            warning("Error reading IPTC tag %s: %s", tag, e.message);
-                        }
-                    }
+                    append_entries(metadata, metadata.get_iptc_tags(), "IPTC", ref entries);
                 } catch (Error e) {
                     warning("Error reading IPTC tags: %s", e.message);
                 }
@@ -105,6 +71,34 @@ namespace Scramble {
 #endif
         }
 
+#if HAVE_GEXIV2
+        /**
+         * Add an entry for every tag of one family with a non-empty value
+         *
+         * @param metadata Parsed metadata to read values from
+         * @param tags Tag names of one metadata family
+         * @param metadata_type Family name stored in the entries
+         * @param entries List the entries are appended to
+         */
+        private static void append_entries(GExiv2.Metadata metadata, string[] tags, string metadata_type,
+                                           ref List<MetadataEntry> entries) {
+            foreach (var tag in tags) {
+                try {
+                    var value = metadata.get_tag_string(tag);
+                    if (value == null) {
+                        continue;
+                    }
+                    var stripped = MetadataFilter.trim_value(value);
+                    if (stripped != "") {
+                        entries.append(new MetadataEntry(tag, stripped, metadata_type));
+                    }
+                } catch (Error e) {
+                    warning("Error reading %s tag %s: %s", metadata_type, tag, e.message);
+                }
+            }
+        }
+#endif
+
         /**
          * Export metadata to JSON format
          *
@@ -119,47 +113,44 @@ namespace Scramble {
             json.append("  \"export_date\": \"%s\",\n".printf(new DateTime.now_local().to_string()));
             json.append("  \"metadata\": {\n");
 
-            // Group by type
-            json.append("    \"exif\": {\n");
-            bool first_exif = true;
+            // Group by type: dispatch each entry to its section in a single pass
+            var exif = new StringBuilder();
+            var xmp = new StringBuilder();
+            var iptc = new StringBuilder();
+
             foreach (var entry in entries) {
-                if (entry.metadata_type == "EXIF") {
-                    if (!first_exif) json.append(",\n");
-                    json.append("      \"%s\": \"%s\"".printf(
-                        escape_json_string(entry.tag),
-                        escape_json_string(entry.value)
-                    ));
-                    first_exif = false;
+                unowned StringBuilder? section = null;
+                switch (entry.metadata_type) {
+                    case "EXIF":
+                        section = exif;
+                        break;
+                    case "XMP":
+                        section = xmp;
+                        break;
+                    case "IPTC":
+                        section = iptc;
+                        break;
+                    default:
+                        continue;
                 }
+
+                if (section.len > 0) section.append(",\n");
+                section.append("      \"%s\": \"%s\"".printf(
+                    escape_json_string(entry.tag),
+                    escape_json_string(entry.value)
+                ));
             }
+
+            json.append("    \"exif\": {\n");
+            json.append(exif.str);
             json.append("\n    },\n");
 
             json.append("    \"xmp\": {\n");
-            bool first_xmp = true;
-            foreach (var entry in entries) {
-                if (entry.metadata_type == "XMP") {
-                    if (!first_xmp) json.append(",\n");
-                    json.append("      \"%s\": \"%s\"".printf(
-                        escape_json_string(entry.tag),
-                        escape_json_string(entry.value)
-                    ));
-                    first_xmp = false;
-                }
-            }
+            json.append(xmp.str);
             json.append("\n    },\n");
 
             json.append("    \"iptc\": {\n");
-            bool first_iptc = true;
-            foreach (var entry in entries) {
-                if (entry.metadata_type == "IPTC") {
-                    if (!first_iptc) json.append(",\n");
-                    json.append("      \"%s\": \"%s\"".printf(
-                        escape_json_string(entry.tag),
-                        escape_json_string(entry.value)
-                    ));
-                    first_iptc = false;
-                }
-            }
+            json.append(iptc.str);
             json.append("\n    }\n");
 
             json.append("  }\n");
@@ -230,22 +221,62 @@ namespace Scramble {
          * Escape a string for JSON
          */
         private static string escape_json_string(string str) {
-            return str.replace("\\", "\\\\")
-                      .replace("\"", "\\\"")
-                      .replace("\n", "\\n")
-                      .replace("\r", "\\r")
-                      .replace("\t", "\\t");
+            // Most tag values need no escaping: scan once and return them as-is.
+            // The owned return still duplicates the value, but once instead of
+            // once per replacement
+            int first = -1;
+            for (int i = 0; i < str.length; i++) {
+                char c = str[i];
+                if (c == '\\' || c == '"' || (uint8) c < 0x20) {
+                    first = i;
+                    break;
+                }
+            }
+            if (first < 0) {
+                return str;
+            }
+
+            var builder = new StringBuilder.sized(str.length + 8);
+            builder.append_len(str, first);
+            for (int i = first; i < str.length; i++) {
+                char c = str[i];
+                switch (c) {
+                    case '\\':
+                        builder.append("\\\\");
+                        break;
+                    case '"':
+                        builder.append("\\\"");
+                        break;
+                    case '\n':
+                        builder.append("\\n");
+                        break;
+                    case '\r':
+                        builder.append("\\r");
+                        break;
+                    case '\t':
+                        builder.append("\\t");
+                        break;
+                    default:
+                        if ((uint8) c < 0x20) {
+                            builder.append_printf("\\u%04x", (uint) c);
+                        } else {
+                            builder.append_c(c);
+                        }
+                        break;
+                }
+            }
+            return builder.str;
         }
 
         /**
          * Escape a field for CSV
          */
         private static string escape_csv_field(string str) {
-            // If contains comma, quote, or newline, enclose in quotes and escape quotes
-            if (str.contains(",") || str.contains("\"") || str.contains("\n")) {
-                return str.replace("\"", "\"\"");
+            // Only fields containing a quote need rewriting; scan once for it
+            if (str.index_of_char('"') < 0) {
+                return str;
             }
-            return str;
+            return str.replace("\"", "\"\"");
         }
     }
 }
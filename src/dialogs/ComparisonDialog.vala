@@ -1,6 +1,5 @@
 using Gtk;
 using Adw;
-using Gdk;
 
 namespace Scramble {
     /**
@@ -9,10 +8,18 @@ namespace Scramble {
     public class ComparisonDialog : Adw.Window {
         private Gtk.Picture original_picture;
         private Gtk.Picture cleaned_picture;
+        private Gtk.Button generate_button;
         private Adw.ToastOverlay toast_overlay;
         private string original_path;
         private string? cleaned_path = null;
 
+        // Private directory holding the preview, created on first generate
+        private string? preview_dir = null;
+
+        // A preview save is running on a worker thread
+        private bool generating = false;
+        private bool disposed = false;
+
         public ComparisonDialog(Gtk.Window parent, string original_image_path) {
             Object(
                 transient_for: parent,
@@ -102,7 +109,7 @@ namespace Scramble {
             cleaned_scroll.child = cleaned_picture;
 
             // Generate preview button
-            var generate_button = new Gtk.Button.with_label(_("Generate Preview"));
+            generate_button = new Gtk.Button.with_label(_("Generate Preview"));
             generate_button.halign = Gtk.Align.CENTER;
             generate_button.valign = Gtk.Align.CENTER;
             generate_button.add_css_class("pill");
@@ -127,27 +134,55 @@ namespace Scramble {
         }
 
         private void generate_cleaned_preview() {
-            show_success_toast(_("Generating clean preview..."));
+            if (generating) {
+                return;
+            }
 
             // Create temporary file for cleaned version
             try {
-                // Generate temp file path
-                var basename = Path.get_basename(original_path);
-                var temp_dir = Environment.get_tmp_dir();
-                cleaned_path = Path.build_filename(temp_dir, "scramble_preview_%s".printf(basename));
-
-                // Save clean copy
-                if (ImageOperations.save_clean_copy(original_path, cleaned_path)) {
-                    // Load cleaned image
-                    var file = File.new_for_path(cleaned_path);
-                    cleaned_picture.set_file(file);
-                    show_success_toast(_("Preview generated successfully"));
-                } else {
-                    show_error_toast(_("Failed to generate clean preview"));
+                // Generate temp file path in a directory only this dialog uses,
+                // so the name cannot collide with or be planted by anyone else
+                if (preview_dir == null) {
+                    preview_dir = DirUtils.make_tmp("scramble-preview-XXXXXX");
                 }
             } catch (Error e) {
                 show_error_toast(_("Error: %s").printf(e.message));
+                return;
             }
+
+            // The previous preview is overwritten, so it can no longer be saved
+            if (cleaned_path != null) {
+                cleaned_picture.set_file(null);
+                delete_temp(cleaned_path);
+                cleaned_path = null;
+            }
+
+            generating = true;
+            generate_button.sensitive = false;
+            show_success_toast(_("Generating clean preview..."));
+
+            // Save clean copy on a worker thread
+            var preview_path = Path.build_filename(preview_dir, Path.get_basename(original_path));
+            ImageOperations.save_clean_copy_async.begin(original_path, preview_path, (obj, res) => {
+                var saved_path = ImageOperations.save_clean_copy_async.end(res);
+                generating = false;
+
+                // Closed while saving: dispose left the files for us to remove
+                if (disposed) {
+                    delete_preview_dir();
+                    return;
+                }
+
+                generate_button.sensitive = true;
+                if (saved_path != null) {
+                    // Only a finished save can be shown or copied
+                    cleaned_path = saved_path;
+                    cleaned_picture.set_file(File.new_for_path(saved_path));
+                    show_success_toast(_("Preview generated successfully"));
+                } else {
+                    show_error_toast(_("Failed to generate clean preview"));
+                }
+            });
         }
 
         private void on_save_clicked() {
@@ -159,8 +194,8 @@ namespace Scramble {
             var dlg = new Gtk.FileDialog();
             dlg.title = _("Save Clean Image");
 
-            // Default name
-            var basename = GLib.Path.get_basename(original_path);
+            // Default name, with the extension of the preview actually written
+            var basename = GLib.Path.get_basename(cleaned_path);
             var dot = basename.last_index_of(".");
             string name = basename;
             string ext = "";
@@ -171,35 +206,7 @@ namespace Scramble {
             dlg.initial_name = "%s_clean%s".printf(name, ext);
 
             // Filters
-            var filters = new GLib.ListStore(typeof(Gtk.FileFilter));
-
-            var f_jpeg = new Gtk.FileFilter();
-            f_jpeg.name = _("JPEG Images");
-            f_jpeg.add_mime_type("image/jpeg");
-            f_jpeg.add_pattern("*.jpg");
-            f_jpeg.add_pattern("*.jpeg");
-            filters.append(f_jpeg);
-
-            var f_png = new Gtk.FileFilter();
-            f_png.name = _("PNG Images");
-            f_png.add_mime_type("image/png");
-            f_png.add_pattern("*.png");
-            filters.append(f_png);
-
-            var f_webp = new Gtk.FileFilter();
-            f_webp.name = _("WebP Images");
-            f_webp.add_mime_type("image/webp");
-            f_webp.add_pattern("*.webp");
-            filters.append(f_webp);
-
-            var f_tiff = new Gtk.FileFilter();
-            f_tiff.name = _("TIFF Images");
-            f_tiff.add_mime_type("image/tiff");
-            f_tiff.add_pattern("*.tif");
-            f_tiff.add_pattern("*.tiff");
-            filters.append(f_tiff);
-
-            dlg.filters = filters;
+            dlg.filters = FileFilters.create_save_filters();
 
             dlg.save.begin(this, null, (obj, res) => {
                 try {
@@ -207,6 +214,12 @@ namespace Scramble {
                     string? out_path = out.get_path();
 
                     if (out_path != null) {
+                        // A new preview may have been started meanwhile
+                        if (cleaned_path == null) {
+                            show_error_toast(_("Please generate preview first"));
+                            return;
+                        }
+
                         // Copy temp file to final location
                         var source = File.new_for_path(cleaned_path);
                         var dest = File.new_for_path(out_path);
@@ -233,18 +246,46 @@ namespace Scramble {
         }
 
         public override void dispose() {
-            // Clean up temp file
-            if (cleaned_path != null) {
-                try {
-                    var file = File.new_for_path(cleaned_path);
-                    if (file.query_exists()) {
-                        file.delete();
-                    }
-                } catch (Error e) {
-                    warning("Failed to delete temp file: %s", e.message);
-                }
+            // Clean up the preview files; dispose() may run more than once.
+            // A running save still writes into the directory, so its
+            // completion removes them instead.
+            disposed = true;
+            cleaned_path = null;
+            if (!generating) {
+                delete_preview_dir();
             }
             base.dispose();
         }
+
+        private void delete_preview_dir() {
+            if (preview_dir == null) {
+                return;
+            }
+
+            // Remove whatever the save wrote (its name can differ from the
+            // requested one, and a failed save may leave a partial file)
+            try {
+                var dir = Dir.open(preview_dir);
+                string? name;
+                while ((name = dir.read_name()) != null) {
+                    delete_temp(Path.build_filename(preview_dir, name));
+                }
+            } catch (FileError e) {
+                debug("Could not list preview directory: %s", e.message);
+            }
+            delete_temp(preview_dir);
+            preview_dir = null;
+        }
+
+        private static void delete_temp(string path) {
+            // Delete directly: a missing file is fine, no separate existence check
+            try {
+                File.new_for_path(path).delete();
+            } catch (IOError.NOT_FOUND e) {
+                // Already gone
+            } catch (Error e) {
+                warning("Failed to delete temp file: %s", e.message);
+            }
+        }
     }
 }
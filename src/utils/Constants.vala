@@ -55,6 +55,11 @@ namespace Scramble {
          */
         public const string[] HEIF_BRANDS = {"heic", "heix", "hevc", "hevx", "mif1", "msf1"};
 
+        /**
+         * Supported image file extensions (lowercase, without the dot)
+         */
+        public const string[] SUPPORTED_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "tif", "tiff", "heif", "heic"};
+
         // ===== File Size and Processing Limits =====
 
         /**
@@ -63,12 +68,33 @@ namespace Scramble {
          */
         public const int64 MAX_FILE_SIZE = 500 * 1024 * 1024;
 
+        /**
+         * Maximum image size in pixels accepted for a full decode: 250 megapixels
+         * Rejects decompression bombs (small files with huge dimensions) from
+         * their header alone, before any pixel buffer is allocated, while
+         * allowing 200 MP camera images
+         */
+        public const int64 MAX_IMAGE_PIXELS = 250 * 1000 * 1000;
+
         /**
          * Maximum number of files in batch processing
          * Prevents UI freezing and excessive memory usage
          */
         public const int BATCH_SIZE_LIMIT = 1000;
 
+        /**
+         * Maximum number of batch worker threads
+         * A worker re-encoding an image holds its full decode, up to about
+         * 1 GB at MAX_IMAGE_PIXELS, so the pool stays small on many-core machines
+         */
+        public const int BATCH_MAX_WORKERS = 4;
+
+        /**
+         * Maximum number of parsed metadata objects kept in memory
+         * Covers re-opening, exporting and comparing recently viewed images
+         */
+        public const int METADATA_CACHE_SIZE = 16;
+
         // ===== Image Quality Settings =====
 
         /**
@@ -97,6 +123,27 @@ namespace Scramble {
          */
         public const int MAGIC_BUFFER_SIZE = 12;
 
+        /**
+         * Chunk size used when streaming a file header to read image dimensions
+         * 64 KiB covers a full JPEG APP segment, so most JPEG, PNG and WebP
+         * headers need one read; TIFF is always read in full
+         */
+        public const int DIMENSION_PROBE_CHUNK_SIZE = 64 * 1024;
+
+        // ===== User Interface =====
+
+        /**
+         * Longest side of the decoded preview image (pixels)
+         * Large enough for a sharp preview pane on HiDPI screens, far smaller
+         * than a full camera image
+         */
+        public const int PREVIEW_MAX_SIZE = 2048;
+
+        /**
+         * Interval within which an identical toast is not shown again (milliseconds)
+         */
+        public const int TOAST_REPEAT_INTERVAL_MS = 1500;
+
         // ===== Performance Targets =====
 
         /**
@@ -0,0 +1,115 @@
+using Gtk;
+
+namespace Scramble {
+    /**
+     * File dialog filters built from one table of image formats
+     *
+     * The open, save and batch dialogs of every window list the same formats,
+     * so their MIME types and extensions are defined here once.
+     */
+    public class FileFilters : Object {
+
+        // Formats accepted as input, in the order dialogs list them
+        private const string[] INPUT_FORMATS = {"jpeg", "png", "webp", "tiff", "heif"};
+
+        // Formats a clean copy can be saved as
+        private const string[] OUTPUT_FORMATS = {"jpeg", "png", "webp", "tiff"};
+
+        /**
+         * Create the filters for opening an image
+         *
+         * @return Filters for all supported images, then for all files
+         */
+        public static GLib.ListStore create_open_filters() {
+            var filters = new GLib.ListStore(typeof(Gtk.FileFilter));
+            filters.append(create_images_filter(_("Image Files")));
+
+            var f_all = new Gtk.FileFilter();
+            f_all.name = _("All Files");
+            f_all.add_pattern("*");
+            filters.append(f_all);
+            return filters;
+        }
+
+        /**
+         * Create the filters for saving a clean copy
+         *
+         * @return One filter per output format
+         */
+        public static GLib.ListStore create_save_filters() {
+            var filters = new GLib.ListStore(typeof(Gtk.FileFilter));
+            foreach (var format in OUTPUT_FORMATS) {
+                var filter = new Gtk.FileFilter();
+                filter.name = format_label(format);
+                add_format(filter, format);
+                filters.append(filter);
+            }
+            return filters;
+        }
+
+        /**
+         * Create one filter matching every supported input format
+         *
+         * @param name Filter name shown in the dialog
+         * @return Filter for all supported images
+         */
+        public static Gtk.FileFilter create_images_filter(string name) {
+            var filter = new Gtk.FileFilter();
+            filter.name = name;
+            foreach (var format in INPUT_FORMATS) {
+                add_format(filter, format);
+            }
+            return filter;
+        }
+
+        /**
+         * Add the MIME types and extensions of a format to a filter
+         */
+        private static void add_format(Gtk.FileFilter filter, string format) {
+            switch (format) {
+                case "jpeg":
+                    filter.add_mime_type("image/jpeg");
+                    filter.add_suffix("jpg");
+                    filter.add_suffix("jpeg");
+                    break;
+                case "png":
+                    filter.add_mime_type("image/png");
+                    filter.add_suffix("png");
+                    break;
+                case "webp":
+                    filter.add_mime_type("image/webp");
+                    filter.add_suffix("webp");
+                    break;
+                case "tiff":
+                    filter.add_mime_type("image/tiff");
+                    filter.add_suffix("tif");
+                    filter.add_suffix("tiff");
+                    break;
+                case "heif":
+                    filter.add_mime_type("image/heif");
+                    filter.add_mime_type("image/heic");
+                    filter.add_suffix("heif");
+                    filter.add_suffix("heic");
+                    break;
+            }
+        }
+
+        /**
+         * Get the name shown for a single-format filter
+         */
+        private static string format_label(string format) {
+            switch (format) {
+                case "jpeg":
+                    return _("JPEG Images");
+                case "png":
+                    return _("PNG Images");
+                case "webp":
+                    return _("WebP Images");
+                case "tiff":
+                    return _("TIFF Images");
+                default:
+                    return _("HEIF/HEIC Images");
+            }
+        }
+    }
+}
@@ -6,6 +6,10 @@ namespace Scramble {
      */
     public class FileValidator : Object {
 
+        // File attributes a fingerprint is built from
+        private const string FINGERPRINT_ATTRIBUTES =
+            "unix::device,unix::inode,standard::size,time::modified,time::modified-usec";
+
         /**
          * Validate a file path for security and sanity
          *
@@ -14,6 +18,31 @@ namespace Scramble {
          * @throws FileError on validation failure with descriptive message
          */
         public static void validate_path(string path) throws FileError {
+            validate_path_info(path);
+        }
+
+        /**
+         * Validate a file path and fingerprint it with the same query
+         *
+         * Loading needs both; this spares the second file system query that
+         * calling validate_path() and get_fingerprint() in turn would make.
+         *
+         * @param path File path to validate
+         * @return Fingerprint of the file, as get_fingerprint() returns it
+         * @throws FileError on validation failure with descriptive message
+         */
+        public static string validate_and_fingerprint(string path) throws FileError {
+            return fingerprint_from_info(validate_path_info(path));
+        }
+
+        /**
+         * Run the validate_path() checks and return the file's info
+         *
+         * @param path File path to validate
+         * @return File info holding the standard and fingerprint attributes
+         * @throws FileError on validation failure with descriptive message
+         */
+        private static FileInfo validate_path_info(string path) throws FileError {
             // Check for null or empty path
             if (path == null || path.strip() == "") {
                 throw new FileError.FAILED(_("File path is empty"));
@@ -24,67 +53,68 @@ namespace Scramble {
                 throw new FileError.FAILED(_("Invalid file path: contains suspicious patterns"));
             }
 
-            // Check if file exists
+            // One query answers existence, type, symlink and size, and
+            // carries the fingerprint attributes as well
             var file = File.new_for_path(path);
-            if (!file.query_exists()) {
+            FileInfo info;
+            try {
+                info = file.query_info("standard::type,standard::is-symlink," + FINGERPRINT_ATTRIBUTES,
+                                       FileQueryInfoFlags.NONE);
+            } catch (IOError.NOT_FOUND e) {
                 throw new FileError.NOENT(_("File does not exist"));
+            } catch (Error e) {
+                throw new FileError.FAILED(_("Cannot access file: %s").printf(e.message));
             }
 
             // Check if it's actually a file (not a directory, symlink, etc.)
-            try {
-                var info = file.query_info("standard::type,standard::is-symlink,standard::size",
-                                          FileQueryInfoFlags.NONE);
-
-                if (info.get_file_type() != FileType.REGULAR) {
-                    throw new FileError.FAILED(_("Path is not a regular file"));
-                }
+            if (info.get_file_type() != FileType.REGULAR) {
+                throw new FileError.FAILED(_("Path is not a regular file"));
+            }
 
-                // Check for symlinks (security concern - SEC-001)
-                if (info.get_is_symlink()) {
-                    #if DEVELOPMENT
-                        // In development, check if symlinks are allowed via settings
-                        var settings = new GLib.Settings(Config.APP_ID);
-                        if (settings.get_boolean("allow-symlinks-dev")) {
-                            warning("Symlink detected in development mode (allowed): %s", sanitize_for_display(path));
-                            // Resolve symlink and validate target
-                            var real_path = FileUtils.read_link(path);
-                            // If relative path, resolve against parent directory
-                            if (!Path.is_absolute(real_path)) {
-                                var parent = Path.get_dirname(path);
-                                real_path = Path.build_filename(parent, real_path);
-                            }
-                            // Recursively validate the target
-                            validate_path(real_path);
-                            return;
+            // Check for symlinks (security concern - SEC-001)
+            if (info.get_is_symlink()) {
+                #if DEVELOPMENT
+                    // In development, check if symlinks are allowed via settings
+                    var settings = new GLib.Settings(Config.APP_ID);
+                    if (settings.get_boolean("allow-symlinks-dev")) {
+                        warning("Symlink detected in development mode (allowed): %s", sanitize_for_display(path));
+                        // Resolve symlink and validate target
+                        var real_path = FileUtils.read_link(path);
+                        // If relative path, resolve against parent directory
+                        if (!Path.is_absolute(real_path)) {
+                            var parent = Path.get_dirname(path);
+                            real_path = Path.build_filename(parent, real_path);
                         }
-                    #endif
-                    // Production mode or dev mode with setting disabled: reject symlinks
-                    warning("Symlink detected and rejected for security: %s", sanitize_for_display(path));
-                    throw new FileError.FAILED(_("Symbolic links are not supported for security reasons"));
-                }
-
-                // Check file size
-                var size = info.get_size();
-                if (size > Constants.MAX_FILE_SIZE) {
-                    throw new FileError.FAILED(_("File too large (max 500 MB)"));
-                }
+                        // Recursively validate the target
+                        return validate_path_info(real_path);
+                    }
+                #endif
+                // Production mode or dev mode with setting disabled: reject symlinks
+                warning("Symlink detected and rejected for security: %s", sanitize_for_display(path));
+                throw new FileError.FAILED(_("Symbolic links are not supported for security reasons"));
+            }
 
-                if (size == 0) {
-                    throw new FileError.FAILED(_("File is empty"));
-                }
+            // Check file size
+            var size = info.get_size();
+            if (size > Constants.MAX_FILE_SIZE) {
+                throw new FileError.FAILED(_("File too large (max 500 MB)"));
+            }
 
-            } catch (Error e) {
-                throw new FileError.FAILED(_("Cannot access file: %s").printf(e.message));
+            if (size == 0) {
+                throw new FileError.FAILED(_("File is empty"));
             }
+
+            return info;
         }
 
         /**
          * Validate output path for saving
          *
          * @param path Output file path
+         * @param input_path Source file path, which must not be overwritten
          * @throws FileError if path is invalid
          */
-        public static void validate_output_path(string path) throws FileError {
+        public static void validate_output_path(string path, string? input_path = null) throws FileError {
             if (path == null || path.strip() == "") {
                 throw new FileError.FAILED(_("Output path is empty"));
             }
@@ -94,10 +124,16 @@ namespace Scramble {
                 throw new FileError.FAILED(_("Invalid output path"));
             }
 
-            // Check if parent directory exists
+            // Never write the cleaned copy over its own source
             var file = File.new_for_path(path);
+            if (input_path != null && is_same_file(file, File.new_for_path(input_path))) {
+                throw new FileError.FAILED(_("Output file must differ from the original image"));
+            }
+
+            // Check if parent directory exists (one stat also confirms it is a directory)
             var parent = file.get_parent();
-            if (parent == null || !parent.query_exists()) {
+            if (parent == null ||
+                parent.query_file_type(FileQueryInfoFlags.NONE) != FileType.DIRECTORY) {
                 throw new FileError.NOENT(_("Output directory does not exist"));
             }
 
@@ -106,6 +142,74 @@ namespace Scramble {
             // We'll let the save operation fail naturally if no permission
         }
 
+        /**
+         * Check whether two paths name the same file on disk
+         *
+         * Compares file identities (device and inode), so a symlink or hard
+         * link to the file, or a differently spelled path, still matches.
+         * An output that does not exist yet can only be compared by its
+         * canonical path, which File.new_for_path() already builds.
+         *
+         * @param output Output file, which may not exist yet
+         * @param input Existing source file
+         * @return true if writing output would overwrite input
+         */
+        private static bool is_same_file(File output, File input) {
+            if (output.equal(input)) {
+                return true;
+            }
+
+            var output_id = get_file_id(output);
+            if (output_id == null) {
+                return false;
+            }
+            return output_id == get_file_id(input);
+        }
+
+        /**
+         * Get the identity of a file, following symlinks
+         *
+         * @return The id::file attribute, or null if the file cannot be queried
+         */
+        private static string? get_file_id(File file) {
+            try {
+                var info = file.query_info(FileAttribute.ID_FILE, FileQueryInfoFlags.NONE);
+                return info.get_attribute_string(FileAttribute.ID_FILE);
+            } catch (Error e) {
+                return null;
+            }
+        }
+
+        /**
+         * Get a cheap identity fingerprint for a file without reading its contents
+         *
+         * Combines device, inode, size and modification time, so two equal
+         * fingerprints mean the same unchanged file on disk. Symlinks are
+         * followed, as in validate_path(), so the fingerprint describes the
+         * file whose contents are read.
+         *
+         * @param path File path
+         * @return Fingerprint string
+         * @throws Error if the file cannot be queried
+         */
+        public static string get_fingerprint(string path) throws Error {
+            var info = File.new_for_path(path).query_info(
+                FINGERPRINT_ATTRIBUTES,
+                FileQueryInfoFlags.NONE
+            );
+            return fingerprint_from_info(info);
+        }
+
+        private static string fingerprint_from_info(FileInfo info) {
+            return "%u:%s:%s:%s:%u".printf(
+                info.get_attribute_uint32(FileAttribute.UNIX_DEVICE),
+                info.get_attribute_uint64(FileAttribute.UNIX_INODE).to_string(),
+                info.get_size().to_string(),
+                info.get_attribute_uint64(FileAttribute.TIME_MODIFIED).to_string(),
+                info.get_attribute_uint32(FileAttribute.TIME_MODIFIED_USEC)
+            );
+        }
+
         /**
          * Sanitize a filename for display (remove sensitive path info)
          *
@@ -0,0 +1,238 @@
+using GLib;
+
+namespace Scramble {
+    /**
+     * Removes metadata segments from JPEG files without decoding them
+     *
+     * A JPEG is a sequence of marker segments followed by the entropy-coded
+     * scan. Metadata lives in its own segments (EXIF and XMP in APP1, IPTC in
+     * APP13, comments in COM), so dropping those and copying everything else
+     * byte for byte yields a clean file with the original pixels, in time
+     * proportional to the file size instead of the pixel count.
+     *
+     * Anything stored after the end of the image is dropped as well: MPF
+     * secondary images carry their own EXIF block, and motion photos append
+     * a whole video.
+     */
+    public class JpegMetadataStripper : Object {
+
+        private const uint8 MARKER_PREFIX = 0xFF;
+        private const uint8 STUFFED_ZERO = 0x00;
+        private const uint8 SOI = 0xD8;
+        private const uint8 EOI = 0xD9;
+        private const uint8 SOS = 0xDA;
+        private const uint8 TEM = 0x01;
+        private const uint8 RST0 = 0xD0;
+        private const uint8 RST7 = 0xD7;
+        private const uint8 APP0 = 0xE0;
+        private const uint8 APP2 = 0xE2;
+        private const uint8 APP14 = 0xEE;
+        private const uint8 APP15 = 0xEF;
+        private const uint8 COM = 0xFE;
+
+        // APP2 segments carrying an ICC colour profile start with this identifier
+        private const string ICC_PROFILE_ID = "ICC_PROFILE";
+
+        /**
+         * Copy a JPEG to out_path with all metadata segments removed
+         *
+         * Keeps APP0 (JFIF), APP14 (Adobe colour transform) and ICC profile
+         * APP2 segments, which affect how the image is rendered. Every other
+         * APPn segment, all comments and any data after the end of the image
+         * are dropped.
+         *
+         * @param in_path Source JPEG path
+         * @param out_path Destination path
+         * @return Number of segments removed, counting trailing data as one
+         * @throws Error if the file cannot be read or is not a valid JPEG
+         */
+        public static int strip(string in_path, string out_path) throws Error {
+            var in_stream = new DataInputStream(File.new_for_path(in_path).read());
+            in_stream.byte_order = DataStreamByteOrder.BIG_ENDIAN;
+
+            var out_file = File.new_for_path(out_path);
+            var out_stream = out_file.replace(null, false, FileCreateFlags.NONE);
+
+            try {
+                var removed = copy_segments(in_stream, out_stream);
+                out_stream.close();
+                return removed;
+            } catch (Error e) {
+                // Never leave a truncated image behind
+                try {
+                    out_stream.close();
+                    out_file.delete();
+                } catch (Error cleanup_error) {
+                    debug("Could not remove partial output: %s", cleanup_error.message);
+                }
+                throw e;
+            } finally {
+                in_stream.close();
+            }
+        }
+
+        /**
+         * Copy marker segments and scans up to and including the end of image
+         */
+        private static int copy_segments(DataInputStream input, OutputStream output) throws Error {
+            if (input.read_byte() != MARKER_PREFIX || input.read_byte() != SOI) {
+                throw new FileError.FAILED(_("Not a valid JPEG file"));
+            }
+            write_marker(output, SOI);
+
+            int removed = 0;
+            var marker = read_marker(input);
+            while (true) {
+                if (marker == EOI) {
+                    write_marker(output, EOI);
+                    // Appended images and videos are not part of this one
+                    if (input.get_available() > 0 || input.fill(-1) > 0) {
+                        removed++;
+                    }
+                    return removed;
+                }
+
+                // Standalone markers carry no length field
+                if (marker == TEM || (marker >= RST0 && marker <= RST7)) {
+                    write_marker(output, marker);
+                    marker = read_marker(input);
+                    continue;
+                }
+
+                var length = input.read_uint16();
+                if (length < 2) {
+                    throw new FileError.FAILED(_("Invalid JPEG structure"));
+                }
+
+                var payload = new uint8[length - 2];
+                size_t bytes_read;
+                input.read_all(payload, out bytes_read);
+                if (bytes_read != payload.length) {
+                    throw new FileError.FAILED(_("Truncated JPEG file"));
+                }
+
+                if (is_metadata_segment(marker, payload)) {
+                    removed++;
+                    marker = read_marker(input);
+                    continue;
+                }
+
+                size_t written;
+                write_marker(output, marker);
+                output.write_all(new uint8[] {(uint8) (length >> 8), (uint8) (length & 0xFF)}, out written);
+                output.write_all(payload, out written);
+
+                // Entropy-coded data follows a scan header up to the next marker;
+                // progressive images have several scans
+                marker = (marker == SOS) ? copy_scan_data(input, output) : read_marker(input);
+            }
+        }
+
+        /**
+         * Read the next marker code, skipping 0xFF fill bytes
+         */
+        private static uint8 read_marker(DataInputStream input) throws Error {
+            if (input.read_byte() != MARKER_PREFIX) {
+                throw new FileError.FAILED(_("Invalid JPEG structure"));
+            }
+
+            // Any number of 0xFF fill bytes may precede the marker code
+            var marker = input.read_byte();
+            while (marker == MARKER_PREFIX) {
+                marker = input.read_byte();
+            }
+            return marker;
+        }
+
+        /**
+         * Copy entropy-coded data up to the marker that ends it
+         *
+         * Inside a scan 0xFF is followed by a stuffed 0x00 or by a RST
+         * marker, which are copied as data; any other marker ends the scan.
+         * The buffered data is scanned in place, so this stays one pass over
+         * the file.
+         *
+         * @return Code of the marker after the scan, EOI if the file ends first
+         */
+        private static uint8 copy_scan_data(DataInputStream input, OutputStream output) throws Error {
+            size_t written;
+            while (true) {
+                if (input.get_available() < 2 && input.fill(-1) <= 0) {
+                    // A file cut short after its last scan still decodes, so
+                    // keep what is there and close it with EOI
+                    if (input.get_available() > 0) {
+                        output.write_all(input.peek_buffer(), out written);
+                        input.skip(input.get_available());
+                    }
+                    return EOI;
+                }
+
+                unowned uint8[] data = input.peek_buffer();
+                int i = 0;
+                while (i + 1 < data.length) {
+                    if (data[i] != MARKER_PREFIX) {
+                        i++;
+                        continue;
+                    }
+                    var next = data[i + 1];
+                    if (next == STUFFED_ZERO || (next >= RST0 && next <= RST7)) {
+                        i += 2;
+                        continue;
+                    }
+
+                    output.write_all(data[0:i], out written);
+                    if (next == MARKER_PREFIX) {
+                        // Fill byte before a marker: drop it and rescan from the next 0xFF
+                        input.skip(i + 1);
+                        break;
+                    }
+                    input.skip(i + 2);
+                    return next;
+                }
+                if (i + 1 >= data.length) {
+                    // A 0xFF at the end of the buffer is kept until its next byte is read
+                    output.write_all(data[0:i], out written);
+                    input.skip(i);
+                }
+            }
+        }
+
+        private static void write_marker(OutputStream output, uint8 marker) throws Error {
+            size_t written;
+            output.write_all(new uint8[] {MARKER_PREFIX, marker}, out written);
+        }
+
+        /**
+         * Check whether a segment holds metadata rather than image data
+         *
+         * @param marker Marker code of the segment
+         * @param payload Segment contents after the length field
+         * @return true if the segment should be dropped
+         */
+        private static bool is_metadata_segment(uint8 marker, uint8[] payload) {
+            if (marker == COM) {
+                return true;
+            }
+            if (marker < APP0 || marker > APP15) {
+                return false;
+            }
+            if (marker == APP0 || marker == APP14) {
+                return false;
+            }
+            if (marker == APP2) {
+                return !has_identifier(payload, ICC_PROFILE_ID);
+            }
+            return true;
+        }
+
+        /**
+         * Check whether a payload starts with a NUL-terminated identifier
+         */
+        private static bool has_identifier(uint8[] payload, string id) {
+            if (payload.length <= id.length || payload[id.length] != 0) {
+                return false;
+            }
+            return Memory.cmp(payload, (void*) id, id.length) == 0;
+        }
+    }
+}
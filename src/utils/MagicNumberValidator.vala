@@ -19,257 +19,234 @@ namespace Scramble {
          * @throws Error if file cannot be read or format validation fails
          */
         public static bool validate_format(string path, string extension) throws Error {
-            var file = File.new_for_path(path);
+            // Opening the file reports a missing file, no separate existence check
+            var stream = File.new_for_path(path).read();
+            try {
+                return validate_stream_format(stream, extension);
+            } finally {
+                stream.close();
+            }
+        }
+
+        /**
+         * Validate the format of an already opened file
+         *
+         * Reads the header from the current position and leaves the stream
+         * open, so callers can rewind it for further header checks instead
+         * of opening the file again.
+         *
+         * @param stream Input stream positioned at the start of the file
+         * @param extension Expected file extension (e.g., "jpg", "png")
+         * @return true if format matches extension, false otherwise
+         * @throws Error if the stream cannot be read
+         */
+        public static bool validate_stream_format(InputStream stream, string extension) throws Error {
+            var expected = format_for_extension(extension.down().replace(".", ""));
+            if (expected == null) {
+                warning("Unknown format extension: %s", extension);
+                return false;
+            }
+
+            var header = read_header(stream);
+            var detected = detect_format(header);
 
-            if (!file.query_exists()) {
-                throw new FileError.NOENT(_("File does not exist: %s").printf(path));
+            if (detected != expected) {
+                warning("%s magic number mismatch (detected: %s, %d header bytes)",
+                        expected.up(), detected ?? "unknown", header.length);
+                return false;
             }
 
-            var ext_lower = extension.down().replace(".", "");
+            return true;
+        }
 
-            // Validate format based on extension
-            switch (ext_lower) {
+        /**
+         * Map a file extension to the format name detect_format() reports
+         *
+         * @param ext Lowercase extension without the dot
+         * @return Format name, or null if the extension is not supported
+         */
+        private static string? format_for_extension(string ext) {
+            switch (ext) {
                 case "jpg":
                 case "jpeg":
-                    return validate_jpeg(file);
-
+                    return "jpeg";
                 case "png":
-                    return validate_png(file);
-
+                    return "png";
                 case "webp":
-                    return validate_webp(file);
-
+                    return "webp";
                 case "tif":
                 case "tiff":
-                    return validate_tiff(file);
-
+                    return "tiff";
                 case "heif":
                 case "heic":
-                    return validate_heif(file);
-
+                    return "heif";
                 default:
-                    warning("Unknown format extension: %s", extension);
-                    return false;
+                    return null;
             }
         }
 
         /**
-         * Validate JPEG format by checking magic number
+         * Read the bytes needed to identify any supported format
          *
-         * JPEG files start with 0xFF 0xD8 0xFF
-         *
-         * @param file File to validate
-         * @return true if valid JPEG, false otherwise
-         * @throws Error if file cannot be read
+         * @param stream Stream to read from
+         * @return Header bytes (shorter than MAGIC_BUFFER_SIZE for tiny files)
+         * @throws Error if the stream cannot be read
          */
-        private static bool validate_jpeg(File file) throws Error {
-            var stream = file.read();
-            var buffer = new uint8[3];
+        private static uint8[] read_header(InputStream stream) throws Error {
+            var buffer = new uint8[Constants.MAGIC_BUFFER_SIZE];
 
             size_t bytes_read;
             stream.read_all(buffer, out bytes_read);
 
-            if (bytes_read < 3) {
-                warning("JPEG validation failed: insufficient bytes (%zu)", bytes_read);
-                return false;
-            }
+            buffer.resize((int) bytes_read);
+            return buffer;
+        }
 
-            bool is_valid = memory_compare(buffer, Constants.JPEG_MAGIC, 3);
+        /**
+         * Identify an image format from its leading bytes
+         *
+         * @param header File header bytes
+         * @return "jpeg", "png", "webp", "tiff" or "heif", or null if unrecognized
+         */
+        private static string? detect_format(uint8[] header) {
+            if (header.length < 3) {
+                return null;
+            }
 
-            if (!is_valid) {
-                warning("JPEG magic number mismatch. Expected: FF D8 FF, Got: %02X %02X %02X",
-                        buffer[0], buffer[1], buffer[2]);
+            // The first byte tells the candidate formats apart
+            switch (header[0]) {
+                case 0xFF:
+                    return is_jpeg(header) ? "jpeg" : null;
+                case 0x89:
+                    return is_png(header) ? "png" : null;
+                case 0x52: // 'R'
+                    return is_webp(header) ? "webp" : null;
+                case 0x49: // 'I'
+                case 0x4D: // 'M'
+                    return is_tiff(header) ? "tiff" : null;
+                default:
+                    // HEIF starts with a box size, so check the ftyp box instead
+                    return is_heif(header) ? "heif" : null;
             }
+        }
 
-            stream.close();
-            return is_valid;
+        /**
+         * Check for the JPEG signature
+         *
+         * JPEG files start with 0xFF 0xD8 0xFF
+         *
+         * @param header File header bytes
+         * @return true if valid JPEG, false otherwise
+         */
+        private static bool is_jpeg(uint8[] header) {
+            return memory_compare(header, 0, Constants.JPEG_MAGIC, 3);
         }
 
         /**
-         * Validate PNG format by checking magic number
+         * Check for the PNG signature
          *
          * PNG files start with 0x89 'P' 'N' 'G' '\r' '\n' 0x1A '\n'
          *
-         * @param file File to validate
+         * @param header File header bytes
          * @return true if valid PNG, false otherwise
-         * @throws Error if file cannot be read
          */
-        private static bool validate_png(File file) throws Error {
-            var stream = file.read();
-            var buffer = new uint8[8];
-
-            size_t bytes_read;
-            stream.read_all(buffer, out bytes_read);
-
-            if (bytes_read < 8) {
-                warning("PNG validation failed: insufficient bytes (%zu)", bytes_read);
-                return false;
-            }
-
-            bool is_valid = memory_compare(buffer, Constants.PNG_MAGIC, 8);
-
-            if (!is_valid) {
-                warning("PNG magic number mismatch. Expected PNG signature");
-            }
-
-            stream.close();
-            return is_valid;
+        private static bool is_png(uint8[] header) {
+            return memory_compare(header, 0, Constants.PNG_MAGIC, 8);
         }
 
         /**
-         * Validate WebP format by checking RIFF container and WEBP signature
+         * Check for the RIFF container and WEBP signature
          *
          * WebP files start with:
          * - Bytes 0-3: 'R' 'I' 'F' 'F' (container)
          * - Bytes 4-7: file size (little-endian)
          * - Bytes 8-11: 'W' 'E' 'B' 'P' (format)
          *
-         * @param file File to validate
+         * @param header File header bytes
          * @return true if valid WebP, false otherwise
-         * @throws Error if file cannot be read
          */
-        private static bool validate_webp(File file) throws Error {
-            var stream = file.read();
-            var buffer = new uint8[12];
-
-            size_t bytes_read;
-            stream.read_all(buffer, out bytes_read);
-
-            if (bytes_read < 12) {
-                warning("WebP validation failed: insufficient bytes (%zu)", bytes_read);
-                return false;
-            }
-
-            // Check RIFF header (bytes 0-3)
-            var riff_buffer = buffer[0:4];
-            bool has_riff = memory_compare(riff_buffer, Constants.WEBP_RIFF, 4);
-
-            // Check WEBP signature (bytes 8-11)
-            var webp_buffer = buffer[8:12];
-            bool has_webp = memory_compare(webp_buffer, Constants.WEBP_WEBP, 4);
-
-            bool is_valid = has_riff && has_webp;
-
-            if (!is_valid) {
-                warning("WebP validation failed. RIFF: %s, WEBP: %s",
-                        has_riff.to_string(), has_webp.to_string());
-            }
-
-            stream.close();
-            return is_valid;
+        private static bool is_webp(uint8[] header) {
+            return memory_compare(header, 0, Constants.WEBP_RIFF, 4) &&
+                   memory_compare(header, 8, Constants.WEBP_WEBP, 4);
         }
 
         /**
-         * Validate TIFF format by checking magic number (both endianness)
+         * Check for the TIFF signature (both endianness)
          *
          * TIFF files can be:
          * - Little-endian: 'I' 'I' 0x2A 0x00
          * - Big-endian: 'M' 'M' 0x00 0x2A
          *
-         * @param file File to validate
+         * @param header File header bytes
          * @return true if valid TIFF, false otherwise
-         * @throws Error if file cannot be read
          */
-        private static bool validate_tiff(File file) throws Error {
-            var stream = file.read();
-            var buffer = new uint8[4];
-
-            size_t bytes_read;
-            stream.read_all(buffer, out bytes_read);
-
-            if (bytes_read < 4) {
-                warning("TIFF validation failed: insufficient bytes (%zu)", bytes_read);
-                return false;
-            }
-
-            // Check for either little-endian or big-endian TIFF
-            bool is_le = memory_compare(buffer, Constants.TIFF_LE, 4);
-            bool is_be = memory_compare(buffer, Constants.TIFF_BE, 4);
-
-            bool is_valid = is_le || is_be;
-
-            if (!is_valid) {
-                warning("TIFF magic number mismatch. Got: %02X %02X %02X %02X",
-                        buffer[0], buffer[1], buffer[2], buffer[3]);
-            }
-
-            stream.close();
-            return is_valid;
+        private static bool is_tiff(uint8[] header) {
+            return memory_compare(header, 0, Constants.TIFF_LE, 4) ||
+                   memory_compare(header, 0, Constants.TIFF_BE, 4);
         }
 
         /**
-         * Validate HEIF/HEIC format by checking ftyp box and brand
+         * Check for the HEIF/HEIC ftyp box and brand
          *
          * HEIF/HEIC files are ISO Base Media File Format (BMFF) containers:
          * - Bytes 0-3: Box size (big-endian uint32)
          * - Bytes 4-7: 'f' 't' 'y' 'p' (box type)
          * - Bytes 8-11: Major brand (e.g., "heic", "mif1")
          *
-         * @param file File to validate
+         * @param header File header bytes
          * @return true if valid HEIF/HEIC, false otherwise
-         * @throws Error if file cannot be read
          */
-        private static bool validate_heif(File file) throws Error {
-            var stream = file.read();
-            var buffer = new uint8[12];
-
-            size_t bytes_read;
-            stream.read_all(buffer, out bytes_read);
-
-            if (bytes_read < 12) {
-                warning("HEIF validation failed: insufficient bytes (%zu)", bytes_read);
-                return false;
-            }
-
-            // Check ftyp box signature (bytes 4-7)
-            var ftyp_buffer = buffer[4:8];
-            bool has_ftyp = memory_compare(ftyp_buffer, Constants.HEIF_FTYP, 4);
-
-            if (!has_ftyp) {
-                warning("HEIF validation failed: missing ftyp box");
+        private static bool is_heif(uint8[] header) {
+            if (header.length < 12 || !memory_compare(header, 4, Constants.HEIF_FTYP, 4)) {
                 return false;
             }
 
-            // Extract brand (bytes 8-11)
-            var brand = "%c%c%c%c".printf(buffer[8], buffer[9], buffer[10], buffer[11]);
-
-            // Check if brand matches known HEIF brands
-            bool valid_brand = false;
+            // Check if the major brand (bytes 8-11) matches a known HEIF brand
             foreach (var known_brand in Constants.HEIF_BRANDS) {
-                if (brand == known_brand) {
-                    valid_brand = true;
-                    break;
+                if (bytes_match_ascii(header, 8, known_brand)) {
+                    return true;
                 }
             }
 
-            if (!valid_brand) {
-                warning("HEIF validation: unrecognized brand '%s'", brand);
+            warning("HEIF validation: unrecognized brand '%c%c%c%c'",
+                    header[8], header[9], header[10], header[11]);
+            return false;
+        }
+
+        /**
+         * Check whether bytes at an offset spell out an ASCII string
+         *
+         * @param buffer Byte array to inspect
+         * @param offset Index of the first byte to compare
+         * @param text ASCII string to compare against
+         * @return true if buffer holds text at offset, false otherwise
+         */
+        private static bool bytes_match_ascii(uint8[] buffer, int offset, string text) {
+            if (buffer.length < offset + text.length) {
+                return false;
             }
 
-            stream.close();
-            return valid_brand;
+            return Memory.cmp(&buffer[offset], (void*) text, text.length) == 0;
         }
 
         /**
-         * Compare two byte arrays for equality
+         * Compare a signature with the header bytes at an offset
          *
-         * @param a First byte array
-         * @param b Second byte array
+         * Compares in place, so signatures that sit past the start of the
+         * header need no sub-array.
+         *
+         * @param header Header bytes
+         * @param offset Index in header of the first byte to compare
+         * @param signature Expected bytes
          * @param len Number of bytes to compare
-         * @return true if arrays match for len bytes, false otherwise
+         * @return true if header holds signature at offset for len bytes, false otherwise
          */
-        private static bool memory_compare(uint8[] a, uint8[] b, int len) {
-            if (a.length < len || b.length < len) {
+        private static bool memory_compare(uint8[] header, int offset, uint8[] signature, int len) {
+            if (header.length < offset + len || signature.length < len) {
                 return false;
             }
 
-            for (int i = 0; i < len; i++) {
-                if (a[i] != b[i]) {
-                    return false;
-                }
-            }
-
-            return true;
+            return Memory.cmp(&header[offset], signature, len) == 0;
         }
 
         /**
@@ -1,3 +1,4 @@
+#if HAVE_GEXIV2
 /**
  * MetadataFilter - Selective metadata removal utility
  * 
@@ -11,8 +12,17 @@ namespace Scramble {
      */
     public class MetadataFilter : Object {
         
+        // Settings keys of the removable categories, one per tag table below
+        private const string[] CATEGORY_KEYS = {
+            "remove-gps",
+            "remove-camera",
+            "remove-datetime",
+            "remove-software",
+            "remove-author"
+        };
+        
         // GPS/Location related tag prefixes
-        private static string[] GPS_TAGS = {
+        private const string[] GPS_TAGS = {
             "Exif.GPSInfo",
             "Exif.Image.GPSTag",
             "Xmp.exif.GPS",
@@ -25,7 +35,7 @@ namespace Scramble {
         };
         
         // Camera/Device related tag prefixes
-        private static string[] CAMERA_TAGS = {
+        private const string[] CAMERA_TAGS = {
             "Exif.Image.Make",
             "Exif.Image.Model",
             "Exif.Image.BodySerialNumber",
@@ -50,7 +60,7 @@ namespace Scramble {
         };
         
         // Date/Time related tag prefixes
-        private static string[] DATETIME_TAGS = {
+        private const string[] DATETIME_TAGS = {
             "Exif.Image.DateTime",
             "Exif.Photo.DateTimeOriginal",
             "Exif.Photo.DateTimeDigitized",
@@ -68,7 +78,7 @@ namespace Scramble {
         };
         
         // Software/Processing related tag prefixes
-        private static string[] SOFTWARE_TAGS = {
+        private const string[] SOFTWARE_TAGS = {
             "Exif.Image.Software",
             "Exif.Image.ProcessingSoftware",
             "Xmp.xmp.CreatorTool",
@@ -82,7 +92,7 @@ namespace Scramble {
         };
         
         // Author/Copyright related tag prefixes
-        private static string[] AUTHOR_TAGS = {
+        private const string[] AUTHOR_TAGS = {
             "Exif.Image.Artist",
             "Exif.Image.Copyright",
             "Exif.Photo.CameraOwnerName",
@@ -110,10 +120,12 @@ namespace Scramble {
          * @return Number of tags removed
          */
         public static int apply_filter(GExiv2.Metadata metadata, GLib.Settings settings) {
-            int removed_count = 0;
-            
-            if (settings.get_boolean("remove-gps")) {
-                removed_count += remove_tags_by_prefix(metadata, GPS_TAGS);
+            var remove_gps = settings.get_boolean("remove-gps");
+
+            // One pass over the tag lists for all enabled categories
+            int removed_count = remove_tags_by_prefix(metadata, collect_enabled_prefixes(settings));
+
+            if (remove_gps) {
                 // Also clear GPS info using the dedicated method
                 try {
                     metadata.delete_gps_info();
@@ -122,22 +134,6 @@ namespace Scramble {
                 }
             }
             
-            if (settings.get_boolean("remove-camera")) {
-                removed_count += remove_tags_by_prefix(metadata, CAMERA_TAGS);
-            }
-            
-            if (settings.get_boolean("remove-datetime")) {
-                removed_count += remove_tags_by_prefix(metadata, DATETIME_TAGS);
-            }
-            
-            if (settings.get_boolean("remove-software")) {
-                removed_count += remove_tags_by_prefix(metadata, SOFTWARE_TAGS);
-            }
-            
-            if (settings.get_boolean("remove-author")) {
-                removed_count += remove_tags_by_prefix(metadata, AUTHOR_TAGS);
-            }
-            
             return removed_count;
         }
         
@@ -149,29 +145,46 @@ namespace Scramble {
          * @return Number of tags that would be removed
          */
         public static int count_tags_to_remove(GExiv2.Metadata metadata, GLib.Settings settings) {
-            int count = 0;
-            
-            if (settings.get_boolean("remove-gps")) {
-                count += count_matching_tags(metadata, GPS_TAGS);
-            }
-            
-            if (settings.get_boolean("remove-camera")) {
-                count += count_matching_tags(metadata, CAMERA_TAGS);
-            }
-            
-            if (settings.get_boolean("remove-datetime")) {
-                count += count_matching_tags(metadata, DATETIME_TAGS);
-            }
-            
-            if (settings.get_boolean("remove-software")) {
-                count += count_matching_tags(metadata, SOFTWARE_TAGS);
+            return count_matching_tags(metadata, collect_enabled_prefixes(settings));
+        }
+        
+        /**
+         * Gather the tag prefixes of every category enabled in settings
+         * 
+         * @param settings GLib.Settings to read preferences from
+         * @return Combined prefix list (empty if nothing is to be removed)
+         */
+        private static string[] collect_enabled_prefixes(GLib.Settings settings) {
+            string[] prefixes = {};
+            foreach (var key in CATEGORY_KEYS) {
+                if (settings.get_boolean(key)) {
+                    foreach (var prefix in prefixes_for_category(key)) {
+                        prefixes += prefix;
+                    }
+                }
             }
-            
-            if (settings.get_boolean("remove-author")) {
-                count += count_matching_tags(metadata, AUTHOR_TAGS);
+            return prefixes;
+        }
+        
+        /**
+         * Get the tag prefixes removed by one category setting
+         * 
+         * @param key Settings key from CATEGORY_KEYS
+         * @return Tag prefixes of that category
+         */
+        private static unowned string[] prefixes_for_category(string key) {
+            switch (key) {
+                case "remove-gps":
+                    return GPS_TAGS;
+                case "remove-camera":
+                    return CAMERA_TAGS;
+                case "remove-datetime":
+                    return DATETIME_TAGS;
+                case "remove-software":
+                    return SOFTWARE_TAGS;
+                default:
+                    return AUTHOR_TAGS;
             }
-            
-            return count;
         }
         
         /**
@@ -181,11 +194,12 @@ namespace Scramble {
          * @return true if all metadata types will be removed
          */
         public static bool is_remove_all(GLib.Settings settings) {
-            return settings.get_boolean("remove-gps") &&
-                   settings.get_boolean("remove-camera") &&
-                   settings.get_boolean("remove-datetime") &&
-                   settings.get_boolean("remove-software") &&
-                   settings.get_boolean("remove-author");
+            foreach (var key in CATEGORY_KEYS) {
+                if (!settings.get_boolean(key)) {
+                    return false;
+                }
+            }
+            return true;
         }
         
         /**
@@ -195,11 +209,30 @@ namespace Scramble {
          * @return true if no metadata will be removed
          */
         public static bool is_keep_all(GLib.Settings settings) {
-            return !settings.get_boolean("remove-gps") &&
-                   !settings.get_boolean("remove-camera") &&
-                   !settings.get_boolean("remove-datetime") &&
-                   !settings.get_boolean("remove-software") &&
-                   !settings.get_boolean("remove-author");
+            foreach (var key in CATEGORY_KEYS) {
+                if (settings.get_boolean(key)) {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        /**
+         * Trim surrounding whitespace from a tag value
+         *
+         * Most tag values are already trimmed, so checking the two ends
+         * first skips the strip() scan for them. The owned return still
+         * duplicates the value either way.
+         *
+         * @param value Tag value as read from the metadata
+         * @return Value without leading or trailing whitespace
+         */
+        public static string trim_value(string value) {
+            if (value.length == 0 ||
+                (!value[0].isspace() && !value[value.length - 1].isspace())) {
+                return value;
+            }
+            return value.strip();
         }
         
         /**
@@ -211,103 +244,129 @@ namespace Scramble {
          */
         private static int remove_tags_by_prefix(GExiv2.Metadata metadata, string[] prefixes) {
             int removed = 0;
+            if (prefixes.length == 0) {
+                return removed;
+            }
             
-            // Process EXIF tags
-            try {
-                var exif_tags = metadata.get_exif_tags();
-                foreach (var tag in exif_tags) {
-                    if (tag_matches_prefixes(tag, prefixes)) {
-                        try {
-                            metadata.clear_tag(tag);
-                            removed++;
-                        } catch (Error e) {
-                            debug("Could not clear tag %s: %s", tag, e.message);
-                        }
-                    }
+            // Each tag is only compared with prefixes of its own family, and a
+            // family with no prefixes is not listed at all
+            var exif_prefixes = prefixes_for_family(prefixes, "Exif.");
+            if (exif_prefixes.length > 0) {
+                try {
+                    removed += clear_matching_tags(metadata, metadata.get_exif_tags(), exif_prefixes);
+                } catch (Error e) {
+                    debug("Error getting EXIF tags: %s", e.message);
                 }
-            } catch (Error e) {
-                debug("Error getting EXIF tags: %s", e.message);
             }
             
-            // Process XMP tags
-            try {
-                var xmp_tags = metadata.get_xmp_tags();
-                foreach (var tag in xmp_tags) {
-                    if (tag_matches_prefixes(tag, prefixes)) {
-                        try {
-                            metadata.clear_tag(tag);
-                            removed++;
-                        } catch (Error e) {
-                            debug("Could not clear tag %s: %s", tag, e.message);
-                        }
-                    }
+            var xmp_prefixes = prefixes_for_family(prefixes, "Xmp.");
+            if (xmp_prefixes.length > 0) {
+                try {
+                    removed += clear_matching_tags(metadata, metadata.get_xmp_tags(), xmp_prefixes);
+                } catch (Error e) {
+                    debug("Error getting XMP tags: %s", e.message);
                 }
-            } catch (Error e) {
-                debug("Error getting XMP tags: %s", e.message);
             }
             
-            // Process IPTC tags
-            try {
-                var iptc_tags = metadata.get_iptc_tags();
-                foreach (var tag in iptc_tags) {
-                    if (tag_matches_prefixes(tag, prefixes)) {
-                        try {
-                            metadata.clear_tag(tag);
-                            removed++;
-                        } catch (Error e) {
-                            debug("Could not clear tag %s: %s", tag, e.message);
-                        }
-                    }
+            var iptc_prefixes = prefixes_for_family(prefixes, "Iptc.");
+            if (iptc_prefixes.length > 0) {
+                try {
+                    removed += clear_matching_tags(metadata, metadata.get_iptc_tags(), iptc_prefixes);
+                } catch (Error e) {
+                    debug("Error getting IPTC tags: %s", e.message);
                 }
-            } catch (Error e) {
-                debug("Error getting IPTC tags: %s", e.message);
             }
             
             return removed;
         }
         
+        /**
+         * Clear every tag in a list that matches one of the prefixes
+         */
+        private static int clear_matching_tags(GExiv2.Metadata metadata, string[] tags, string[] prefixes) {
+            int removed = 0;
+            foreach (var tag in tags) {
+                if (tag_matches_prefixes(tag, prefixes)) {
+                    try {
+                        metadata.clear_tag(tag);
+                        removed++;
+                    } catch (Error e) {
+                        debug("Could not clear tag %s: %s", tag, e.message);
+                    }
+                }
+            }
+            return removed;
+        }
+        
         /**
          * Count tags matching given prefixes
          */
         private static int count_matching_tags(GExiv2.Metadata metadata, string[] prefixes) {
             int count = 0;
+            if (prefixes.length == 0) {
+                return count;
+            }
             
-            try {
-                var exif_tags = metadata.get_exif_tags();
-                foreach (var tag in exif_tags) {
-                    if (tag_matches_prefixes(tag, prefixes)) {
-                        count++;
-                    }
+            var exif_prefixes = prefixes_for_family(prefixes, "Exif.");
+            if (exif_prefixes.length > 0) {
+                try {
+                    count += count_prefixed(metadata.get_exif_tags(), exif_prefixes);
+                } catch (Error e) {
+                    debug("Error counting EXIF tags: %s", e.message);
                 }
-            } catch (Error e) {
-                debug("Error counting EXIF tags: %s", e.message);
             }
             
-            try {
-                var xmp_tags = metadata.get_xmp_tags();
-                foreach (var tag in xmp_tags) {
-                    if (tag_matches_prefixes(tag, prefixes)) {
-                        count++;
-                    }
+            var xmp_prefixes = prefixes_for_family(prefixes, "Xmp.");
+            if (xmp_prefixes.length > 0) {
+                try {
+                    count += count_prefixed(metadata.get_xmp_tags(), xmp_prefixes);
+                } catch (Error e) {
+                    debug("Error counting XMP tags: %s", e.message);
                 }
-            } catch (Error e) {
-                debug("Error counting XMP tags: %s", e.message);
             }
             
-            try {
-                var iptc_tags = metadata.get_iptc_tags();
-                foreach (var tag in iptc_tags) {
-                    if (tag_matches_prefixes(tag, prefixes)) {
-                        count++;
-                    }
+            var iptc_prefixes = prefixes_for_family(prefixes, "Iptc.");
+            if (iptc_prefixes.length > 0) {
+                try {
+                    count += count_prefixed(metadata.get_iptc_tags(), iptc_prefixes);
+                } catch (Error e) {
+                    debug("Error counting IPTC tags: %s", e.message);
                 }
-            } catch (Error e) {
-                debug("Error counting IPTC tags: %s", e.message);
             }
             
             return count;
         }
         
+        /**
+         * Count the tags in a list that match one of the prefixes
+         */
+        private static int count_prefixed(string[] tags, string[] prefixes) {
+            int count = 0;
+            foreach (var tag in tags) {
+                if (tag_matches_prefixes(tag, prefixes)) {
+                    count++;
+                }
+            }
+            return count;
+        }
+        
+        /**
+         * Select the prefixes belonging to one metadata family
+         * 
+         * @param prefixes Tag prefixes of all families
+         * @param family Family prefix ("Exif.", "Xmp." or "Iptc.")
+         * @return Prefixes starting with family
+         */
+        private static string[] prefixes_for_family(string[] prefixes, string family) {
+            string[] selected = {};
+            foreach (var prefix in prefixes) {
+                if (prefix.has_prefix(family)) {
+                    selected += prefix;
+                }
+            }
+            return selected;
+        }
+        
         /**
          * Check if a tag matches any of the given prefixes
          */
@@ -321,3 +380,4 @@ namespace Scramble {
         }
     }
 }
+#endif
@@ -1,5 +1,3 @@
-using Gdk;
-
 namespace Scramble {
     /**
      * Secure memory handling to prevent data leaks
@@ -19,11 +17,9 @@ namespace Scramble {
             // Get pixel data
             unowned uint8[] pixels = pixbuf.get_pixels_with_length();
 
-            // Overwrite with zeros (multiple passes for security)
-            for (int pass = 0; pass < 3; pass++) {
-                for (int i = 0; i < pixels.length; i++) {
-                    pixels[i] = (uint8)(pass == 0 ? 0 : (pass == 1 ? 0xFF : 0));
-                }
+            // Overwrite the whole buffer at once per pass (multiple passes for security)
+            for (int pass = 0; pass < Constants.SECURE_MEMORY_PASSES; pass++) {
+                GLib.Memory.set(pixels, pass_pattern(pass), pixels.length);
             }
         }
 
@@ -38,15 +34,20 @@ namespace Scramble {
             }
 
             // Overwrite string memory (multiple passes)
-            for (int pass = 0; pass < 3; pass++) {
-                for (int i = 0; i < data.length; i++) {
-                    data.data[i] = (char)(pass == 0 ? 0 : (pass == 1 ? 0xFF : 0));
-                }
+            for (int pass = 0; pass < Constants.SECURE_MEMORY_PASSES; pass++) {
+                GLib.Memory.set(data.data, pass_pattern(pass), data.length);
             }
 
             data = null;
         }
 
+        /**
+         * Byte pattern written on a given clearing pass (zeros, ones, zeros)
+         */
+        private static int pass_pattern(int pass) {
+            return pass == 1 ? 0xFF : 0;
+        }
+
         /**
          * Check if secure memory clearing is enabled in settings
          *
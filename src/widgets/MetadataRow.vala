@@ -10,25 +10,50 @@ namespace Scramble {
     public class MetadataRow : Adw.ActionRow {
         [GtkChild] private unowned Gtk.Button copy_button;
 
-        public string key_name { get; set; default = ""; }
-        public string value_text { get; set; default = ""; }
+        // Pending timeout that re-enables the copy button (0 when none)
+        private uint copy_feedback_source = 0;
+
+        // Clipboard shared by all rows, looked up on first copy
+        private static Gdk.Clipboard? clipboard = null;
 
         public MetadataRow(string key_name = "", string value_text = "") {
             Object();
-            this.key_name = key_name;
-            this.value_text = value_text;
             this.title = key_name;
             this.subtitle = value_text;
 
-            copy_button.clicked.connect(() => {
+            copy_button.clicked.connect(on_copy_clicked);
+        }
+
+        private void on_copy_clicked() {
+            if (clipboard == null) {
                 var display = Gdk.Display.get_default();
                 if (display != null) {
-                    var cb = display.get_clipboard();
-                    cb.set_text(this.value_text);
+                    clipboard = display.get_clipboard();
                 }
-                copy_button.sensitive = false;
-                GLib.Timeout.add(1000, () => { copy_button.sensitive = true; return GLib.Source.REMOVE; });
-            });
+            }
+            if (clipboard != null) {
+                clipboard.set_text(this.subtitle);
+            }
+
+            // Brief feedback: disable the button for a second, one timer per row
+            copy_button.sensitive = false;
+            if (copy_feedback_source == 0) {
+                copy_feedback_source = GLib.Timeout.add_seconds(1, on_copy_feedback_done);
+            }
+        }
+
+        private bool on_copy_feedback_done() {
+            copy_feedback_source = 0;
+            copy_button.sensitive = true;
+            return GLib.Source.REMOVE;
+        }
+
+        public override void dispose() {
+            if (copy_feedback_source != 0) {
+                GLib.Source.remove(copy_feedback_source);
+                copy_feedback_source = 0;
+            }
+            base.dispose();
         }
 
         public void set_icon(string icon_name) {
@@ -36,7 +61,10 @@ namespace Scramble {
         }
 
         public void update_value(string new_value) {
-            this.value_text = new_value;
+            // Reloads often show the same values; skip the property round-trip
+            if (this.subtitle == new_value) {
+                return;
+            }
             this.subtitle = new_value;
         }
     }